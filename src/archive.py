@@ -0,0 +1,315 @@
+"""
+Archive Output
+
+Instead of one file per note, a run can be streamed into a single archive:
+an uncompressed ``tar``, an xz-compressed ``tar.xz`` or a deflated ``zip``.
+Compression runs in a thread pool (zlib and lzma release the GIL), and the
+compressed pieces are appended in submission order, so notes appear in the
+archive in export order.
+
+A ``tar.xz`` archive is written as a series of independent xz streams, one
+per chunk of the tar stream, which lets the chunks be compressed in parallel.
+Concatenated xz streams form a valid ``.xz`` file for ``xz``, ``tar`` and
+Python's ``lzma`` alike. Zip members are deflated one note per task; the zip
+container itself is written here, since ``zipfile`` cannot store data that
+was compressed elsewhere.
+
+The archive is written to a temporary file and moved into place when it is
+complete, so an interrupted run never leaves a truncated archive behind.
+"""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+import lzma
+import os
+from pathlib import Path
+import struct
+import tarfile
+import time
+from types import TracebackType
+from typing import Any, NamedTuple
+import zlib
+
+from .writer import WRITE_THREADS, NoteWriteError, fsync_directory
+
+ARCHIVE_FORMATS = ("tar", "tar.xz", "zip")
+
+XZ_CHUNK_SIZE = 1 << 20
+XZ_FILTERS = [{"id": lzma.FILTER_LZMA2, "preset": 6, "dict_size": XZ_CHUNK_SIZE}]
+
+ZIP_VERSION = 20
+ZIP64_VERSION = 45
+ZIP_DEFLATED = 8
+ZIP_UTF8_FLAG = 0x800
+ZIP_LIMIT = 0xFFFFFFFF
+ZIP_COUNT_LIMIT = 0xFFFF
+
+
+class ArchiveWriter[R](ABC):
+    """Writes notes into one archive file, compressing them in a thread pool.
+
+    Subclasses submit compression tasks with ``_submit``, append their results
+    in ``_append``, which is called in submission order, and close the format
+    in ``_finish``. Like the NoteWriter, at most ``threads * 2`` tasks are
+    pending at a time, and errors are raised as NoteWriteError.
+    """
+
+    def __init__(self, path: Path, durable: bool = False, threads: int = WRITE_THREADS):
+        self.path = path
+        self.durable = durable
+        self.mtime = int(time.time())
+        self._tmp_path = path.with_name(f".{path.name}.tmp")
+        self._file = open(self._tmp_path, "wb")  # noqa: SIM115
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="archiver")
+        self._limit = threads * 2
+        self._pending: deque[tuple[str, Future[R]]] = deque()
+
+    @abstractmethod
+    def write(self, filename: str, content: bytes) -> None:
+        """Add ``content`` to the archive as ``filename``."""
+
+    def close(self) -> None:
+        """Wait for all pending members, finish the archive and move it into place."""
+        try:
+            while self._pending:
+                self._finish_oldest()
+            try:
+                self._finish()
+                if self.durable:
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                self._file.close()
+                os.replace(self._tmp_path, self.path)
+                if self.durable:
+                    fsync_directory(self.path.parent)
+            except OSError as e:
+                raise NoteWriteError(self.path.name, e) from e
+        except BaseException:
+            self._discard()
+            raise
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> "ArchiveWriter[R]":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._executor.shutdown(cancel_futures=True)
+            self._discard()
+
+    def _submit(self, filename: str, task: Callable[..., R], *args: object) -> None:
+        while len(self._pending) >= self._limit:
+            self._finish_oldest()
+        self._pending.append((filename, self._executor.submit(task, *args)))
+
+    def _finish_oldest(self) -> None:
+        filename, future = self._pending.popleft()
+        try:
+            self._append(future.result())
+        except OSError as e:
+            raise NoteWriteError(filename, e) from e
+
+    @abstractmethod
+    def _append(self, result: R) -> None:
+        """Append one finished compression result to the archive."""
+
+    @abstractmethod
+    def _finish(self) -> None:
+        """Write whatever the format needs after the last member."""
+
+    def _discard(self) -> None:
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+class TarArchiveWriter(ArchiveWriter[bytes]):
+    """Writes a POSIX tar archive, optionally as chunks of xz streams."""
+
+    def __init__(
+        self, path: Path, compress: bool, durable: bool = False, threads: int = WRITE_THREADS
+    ):
+        super().__init__(path, durable, threads)
+        self.compress = compress
+        self._chunk = bytearray()
+        self._size = 0
+
+    def write(self, filename: str, content: bytes) -> None:
+        info = tarfile.TarInfo(filename)
+        info.size = len(content)
+        info.mtime = self.mtime
+        info.mode = 0o644
+        padding = -len(content) % tarfile.BLOCKSIZE
+        member = info.tobuf(tarfile.PAX_FORMAT, "utf-8") + content + tarfile.NUL * padding
+        self._size += len(member)
+
+        if not self.compress:
+            try:
+                self._file.write(member)
+            except OSError as e:
+                raise NoteWriteError(filename, e) from e
+            return
+
+        self._chunk += member
+        if len(self._chunk) >= XZ_CHUNK_SIZE:
+            self._submit(filename, _compress_xz, bytes(self._chunk))
+            self._chunk.clear()
+
+    def _append(self, result: bytes) -> None:
+        self._file.write(result)
+
+    def _finish(self) -> None:
+        # Two empty blocks end the archive, padded to a full record like tarfile does
+        trailer_size = 2 * tarfile.BLOCKSIZE
+        trailer_size += -(self._size + trailer_size) % tarfile.RECORDSIZE
+        self._chunk += tarfile.NUL * trailer_size
+        self._file.write(_compress_xz(bytes(self._chunk)) if self.compress else self._chunk)
+        self._chunk.clear()
+
+
+class _ZipEntry(NamedTuple):
+    name: bytes
+    crc: int
+    compressed_size: int
+    size: int
+    offset: int
+
+
+class ZipArchiveWriter(ArchiveWriter[tuple[bytes, int, int, bytes]]):
+    """Writes a zip archive of deflated members, with zip64 records where needed."""
+
+    def __init__(self, path: Path, durable: bool = False, threads: int = WRITE_THREADS):
+        super().__init__(path, durable, threads)
+        local_time = time.localtime(self.mtime)
+        self._dos_time = local_time.tm_hour << 11 | local_time.tm_min << 5 | local_time.tm_sec // 2
+        self._dos_date = (
+            max(local_time.tm_year - 1980, 0) << 9 | local_time.tm_mon << 5 | local_time.tm_mday
+        )
+        self._entries: list[_ZipEntry] = []
+        self._offset = 0
+
+    def write(self, filename: str, content: bytes) -> None:
+        self._submit(filename, _deflate, filename.encode("utf-8"), content)
+
+    def _append(self, result: tuple[bytes, int, int, bytes]) -> None:
+        name, crc, size, data = result
+        if size > ZIP_LIMIT or len(data) > ZIP_LIMIT:
+            raise OSError(f"{name.decode()} is too large for a zip member")
+
+        header = struct.pack(
+            "<4s2B4HL2L2H",
+            b"PK\x03\x04",
+            ZIP_VERSION,
+            0,
+            ZIP_UTF8_FLAG,
+            ZIP_DEFLATED,
+            self._dos_time,
+            self._dos_date,
+            crc,
+            len(data),
+            size,
+            len(name),
+            0,
+        )
+        self._entries.append(_ZipEntry(name, crc, len(data), size, self._offset))
+        self._file.write(header + name)
+        self._file.write(data)
+        self._offset += len(header) + len(name) + len(data)
+
+    def _finish(self) -> None:
+        directory_offset = self._offset
+        directory = bytearray()
+        for entry in self._entries:
+            extra = b""
+            offset = entry.offset
+            version = ZIP_VERSION
+            if offset >= ZIP_LIMIT:
+                extra = struct.pack("<2HQ", 1, 8, offset)
+                offset = ZIP_LIMIT
+                version = ZIP64_VERSION
+            directory += struct.pack(
+                "<4s4B4HL2L5H2L",
+                b"PK\x01\x02",
+                version,
+                3,  # created on Unix, so the permissions below are honored
+                version,
+                0,
+                ZIP_UTF8_FLAG,
+                ZIP_DEFLATED,
+                self._dos_time,
+                self._dos_date,
+                entry.crc,
+                entry.compressed_size,
+                entry.size,
+                len(entry.name),
+                len(extra),
+                0,
+                0,
+                0,
+                0o100644 << 16,
+                offset,
+            )
+            directory += entry.name + extra
+
+        count = len(self._entries)
+        directory_size = len(directory)
+        if count >= ZIP_COUNT_LIMIT or directory_offset >= ZIP_LIMIT or directory_size >= ZIP_LIMIT:
+            zip64_offset = directory_offset + directory_size
+            directory += struct.pack(
+                "<4sQ2H2L4Q",
+                b"PK\x06\x06",
+                44,
+                ZIP64_VERSION,
+                ZIP64_VERSION,
+                0,
+                0,
+                count,
+                count,
+                directory_size,
+                directory_offset,
+            )
+            directory += struct.pack("<4sLQL", b"PK\x06\x07", 0, zip64_offset, 1)
+            count = min(count, ZIP_COUNT_LIMIT)
+            directory_size = min(directory_size, ZIP_LIMIT)
+            directory_offset = min(directory_offset, ZIP_LIMIT)
+
+        directory += struct.pack(
+            "<4s4H2LH",
+            b"PK\x05\x06",
+            0,
+            0,
+            count,
+            count,
+            directory_size,
+            directory_offset,
+            0,
+        )
+        self._file.write(directory)
+
+
+def _compress_xz(data: bytes) -> bytes:
+    return lzma.compress(data, format=lzma.FORMAT_XZ, filters=XZ_FILTERS)
+
+
+def _deflate(name: bytes, content: bytes) -> tuple[bytes, int, int, bytes]:
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+    data = compressor.compress(content) + compressor.flush()
+    return name, zlib.crc32(content), len(content), data
+
+
+def open_archive(path: Path, output_format: str, durable: bool = False) -> ArchiveWriter[Any]:
+    """Create an archive writer for one of the ``ARCHIVE_FORMATS``."""
+    if output_format == "zip":
+        return ZipArchiveWriter(path, durable)
+    if output_format in ("tar", "tar.xz"):
+        return TarArchiveWriter(path, compress=output_format == "tar.xz", durable=durable)
+    raise ValueError(f"Unsupported archive format: {output_format}")
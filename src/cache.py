@@ -0,0 +1,185 @@
+"""
+Per-File Extraction Cache
+
+LevelDB tables are immutable once written, so the buffers and grammars
+extracted from a file stay valid for as long as the file itself is unchanged.
+Each file's results are stored as JSON under the cache directory, keyed by the
+file's identity (name, inode, size and modification time), and are reused on
+later runs instead of parsing the file again.
+
+The active write-ahead log only ever grows, so its entry also keeps a cursor
+after the last complete record. When the log has grown, parsing resumes at the
+cursor and the new records are appended to the cached ones.
+
+Entries are also kept in memory, so a long-running watch process only parses
+the files that changed between two events, with or without a cache directory.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from .utils import ExtractedRecord, LogCursor
+
+CACHE_VERSION = 3
+
+
+def file_identity(path: Path) -> dict[str, int | str]:
+    """Describe a file well enough to notice when it has been replaced or modified."""
+    stat = path.stat()
+    return {
+        "name": path.name,
+        "inode": stat.st_ino,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def _encode_record(record: ExtractedRecord) -> dict[str, Any]:
+    return {
+        "key": record.key.hex(),
+        "sequence": record.sequence,
+        "value_type": record.value_type,
+        "buffers": {bid: text.decode("utf-8") for bid, text in record.buffers.items()},
+        "grammars": record.grammars,
+        "sizes": record.sizes,
+    }
+
+
+def _decode_record(data: dict[str, Any]) -> ExtractedRecord:
+    return ExtractedRecord(
+        bytes.fromhex(data["key"]),
+        data["sequence"],
+        data["value_type"],
+        {bid: text.encode("utf-8") for bid, text in data["buffers"].items()},
+        data["grammars"],
+        data["sizes"],
+    )
+
+
+def write_json_atomic(path: Path, data: Any) -> None:
+    """Write JSON to a temporary file and move it into place."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+class _CacheEntry(NamedTuple):
+    identity: dict[str, int | str]
+    records: list[ExtractedRecord]
+    cursor: LogCursor | None
+
+
+class ExtractionCache:
+    """Extraction results of one LevelDB directory.
+
+    Entries are kept in memory for the lifetime of the cache, which is all that
+    watch mode needs between events. With a ``cache_dir`` they are also
+    persisted there, so later runs can reuse them; a single run that does not
+    need them twice can then leave them on disk only (``keep_in_memory=False``).
+    """
+
+    def __init__(self, cache_dir: Path | None, atom_db_dir: Path, keep_in_memory: bool = True):
+        self.directory: Path | None = None
+        if cache_dir is not None:
+            db_hash = hashlib.sha256(str(atom_db_dir).encode()).hexdigest()[:16]
+            self.directory = cache_dir / db_hash
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._entries: dict[str, _CacheEntry] = {}
+        self._keep_in_memory = keep_in_memory or cache_dir is None
+
+    def _entry_path(self, directory: Path, path: Path) -> Path:
+        return directory / f"{path.name}.json"
+
+    def _load(self, path: Path) -> _CacheEntry | None:
+        entry = self._entries.get(path.name)
+        if entry is not None or self.directory is None:
+            return entry
+
+        try:
+            data = json.loads(self._entry_path(self.directory, path).read_text(encoding="utf-8"))
+            if data.get("version") != CACHE_VERSION:
+                return None
+            entry = _CacheEntry(
+                data["identity"],
+                [_decode_record(record) for record in data["records"]],
+                LogCursor(**data["cursor"]) if data["cursor"] is not None else None,
+            )
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+        if self._keep_in_memory:
+            self._entries[path.name] = entry
+        return entry
+
+    def get(self, path: Path) -> list[ExtractedRecord] | None:
+        """Return the cached results for ``path``, or None if it is missing or stale."""
+        entry = self._load(path)
+        if entry is None:
+            return None
+
+        try:
+            identity = file_identity(path)
+        except OSError:
+            return None
+
+        return entry.records if entry.identity == identity else None
+
+    def get_resumable(self, path: Path) -> tuple[list[ExtractedRecord], LogCursor] | None:
+        """Return the cached results and log cursor of a file that may have grown.
+
+        The file must still be the same inode; whether its contents still match
+        the cursor is checked when the file is parsed.
+        """
+        entry = self._load(path)
+        if entry is None or entry.cursor is None:
+            return None
+
+        try:
+            inode = path.stat().st_ino
+        except OSError:
+            return None
+
+        return (entry.records, entry.cursor) if entry.identity.get("inode") == inode else None
+
+    def put(
+        self,
+        path: Path,
+        identity: dict[str, int | str],
+        records: list[ExtractedRecord],
+        cursor: LogCursor | None = None,
+    ) -> None:
+        """Store the results extracted from ``path``.
+
+        ``identity`` must be taken before the file is parsed, so a file that
+        changes while it is being read is parsed again on the next run.
+        """
+        if self._keep_in_memory:
+            self._entries[path.name] = _CacheEntry(identity, records, cursor)
+        if self.directory is None:
+            return
+
+        data = {
+            "version": CACHE_VERSION,
+            "identity": identity,
+            "cursor": cursor._asdict() if cursor is not None else None,
+            "records": [_encode_record(record) for record in records],
+        }
+        write_json_atomic(self._entry_path(self.directory, path), data)
+
+    def prune(self, live_paths: list[Path]) -> None:
+        """Drop entries for files that no longer take part in the database."""
+        keep = {path.name for path in live_paths}
+        for name in list(self._entries):
+            if name not in keep:
+                del self._entries[name]
+
+        if self.directory is None:
+            return
+
+        for entry_path in self.directory.glob("*.json"):
+            if entry_path.name.removesuffix(".json") not in keep:
+                entry_path.unlink(missing_ok=True)
@@ -1,27 +1,33 @@
 import argparse
+from collections.abc import Iterable, Iterator
+import hashlib
+import itertools
+import logging
 import re
 import sys
 import time
-from typing import NoReturn
+from typing import Any, NoReturn
 
 from pydantic import ValidationError
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
 
+from src.archive import ARCHIVE_FORMATS, ArchiveWriter, open_archive
+from src.cache import ExtractionCache
 from src.constants import GRAMMAR_TO_EXTENSION
+from src.fingerprint import database_fingerprint, load_fingerprint, store_fingerprint
 from src.models import CliConfig
-
-from .utils import (
-    collect_files,
-    extract_buffer_grammars,
-    extract_buffers_by_id,
-    is_internal_buffer,
-    normalize_text,
-)
+from src.notes import Note, NoteFilter, iter_notes
+from src.pipeline import bounded
+from src.snapshot import SnapshotStore
+from src.watch import open_watcher, wait_for_change
+from src.writer import NoteWriteError, NoteWriter, fsync_directory
 
 console = Console()
 
+STABLE_NAME_ID_LENGTH = 8
+
 
 class RichArgumentParser(argparse.ArgumentParser):
     """Custom ArgumentParser that formats errors with Rich."""
@@ -46,6 +52,243 @@ class RichArgumentParser(argparse.ArgumentParser):
         sys.exit(2)
 
 
+class ConsoleLogHandler(logging.Handler):
+    """Render library log records as dim progress lines, or warnings, on the console."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.levelno >= logging.WARNING:
+            console.print(Text(f"⚠ {record.getMessage()}", style="yellow"))
+        else:
+            console.print(Text(f"→ {record.getMessage()}", style="dim"))
+
+
+def _install_log_handler() -> None:
+    """Route the library's progress messages to the console, once per process."""
+    library_logger = logging.getLogger("src")
+    library_logger.setLevel(logging.INFO)
+    if not any(isinstance(handler, ConsoleLogHandler) for handler in library_logger.handlers):
+        library_logger.addHandler(ConsoleLogHandler())
+
+
+def _note_filter(config: CliConfig) -> NoteFilter:
+    """Build the note filter from the filter options."""
+    return NoteFilter(
+        include_grammars=frozenset(config.include_grammars),
+        exclude_grammars=frozenset(config.exclude_grammars),
+        min_size=config.min_size,
+        max_size=config.max_size,
+        pattern=re.compile(config.match) if config.match is not None else None,
+    )
+
+
+def _read_notes(config: CliConfig, cache: ExtractionCache | None) -> Iterator[Note] | None:
+    """Stream the notes of the configured directory through a bounded background stage.
+
+    Returns None when the directory holds no LevelDB files.
+    """
+    try:
+        notes = iter_notes(
+            config.atom_db_dir,
+            jobs=config.jobs,
+            default_extension=config.force_ext,
+            cache=cache,
+            note_filter=_note_filter(config),
+        )
+    except FileNotFoundError:
+        return None
+    return bounded(notes)
+
+
+def _exit_with_write_error(filename: str, error: OSError) -> NoReturn:
+    """Report a note that could not be written and exit."""
+    error_text = Text()
+    error_text.append("✗ ", style="bold red")
+    error_text.append(f"Failed to write file: {filename}\n", style="red")
+    error_text.append(f"Error: {error}", style="dim red")
+
+    console.print()
+    console.print(
+        Panel(
+            error_text,
+            title="[bold red]File Write Error[/bold red]",
+            border_style="red",
+            padding=(1, 2),
+        )
+    )
+    console.print()
+    sys.exit(1)
+
+
+def _note_filename(config: CliConfig, note: Note, index: int, used_names: set[str]) -> str:
+    """Derive a file name from the note's first line, unique among ``used_names``."""
+    # Decode only the first line; the rest of the note is written as bytes
+    end = note.content.find(b"\n")
+    head = note.content[:end] if end >= 0 else note.content
+    lines = head.decode("utf-8", errors="replace").splitlines()
+    first_line = lines[0].strip() if lines else "note"
+    if not first_line:
+        first_line = "note"
+
+    slug = re.sub(r"[^a-zA-Z0-9]+", "-", first_line).lower().strip("-")
+    if len(slug) > 60:
+        slug = slug[:60].rstrip("-")
+    if not slug:
+        slug = "note"
+    if config.stable_names:
+        # Buffer IDs are random, so their prefix is a short hash that stays the same
+        # between runs; it only grows when two notes would share a name.
+        id_length = STABLE_NAME_ID_LENGTH
+        filename = f"{slug}__{note.buffer_id[:id_length]}.{note.extension}"
+        while filename.lower() in used_names:
+            id_length += STABLE_NAME_ID_LENGTH
+            filename = f"{slug}__{note.buffer_id[:id_length]}.{note.extension}"
+    else:
+        filename = f"{slug}__{index:03d}.{note.extension}"
+    used_names.add(filename.lower())
+    return filename
+
+
+def _export_notes(config: CliConfig, notes: Iterable[Note]) -> None:
+    """Write notes into a new timestamped directory or archive under the output directory.
+
+    Each note is handed to the writer pool as soon as it arrives.
+    """
+    console.print("\n[cyan]→ Exporting notes:[/cyan]")
+
+    ts = time.strftime("%Y%m%d-%H%M%S")
+    store = None
+    writer: NoteWriter | ArchiveWriter[Any]
+    if config.output_format == "dir":
+        export_path = config.out_dir / ts
+        description, kind = "timestamp directory", "Directory"
+    else:
+        export_path = config.out_dir / f"{ts}.{config.output_format}"
+        description, kind = f"{config.output_format} archive", "Archive"
+    try:
+        if config.output_format == "dir":
+            export_path.mkdir(parents=True, exist_ok=True)
+            if config.snapshot_store:
+                store = SnapshotStore(config.out_dir, durable=config.durable)
+            writer = NoteWriter(export_path, durable=config.durable)
+        else:
+            writer = open_archive(export_path, config.output_format, durable=config.durable)
+    except OSError as e:
+        error_text = Text()
+        error_text.append("✗ ", style="bold red")
+        error_text.append(f"Failed to create {description}: {export_path}\n", style="red")
+        error_text.append(f"Error: {e}", style="dim red")
+
+        console.print()
+        console.print(
+            Panel(
+                error_text,
+                title=f"[bold red]{kind} Creation Error[/bold red]",
+                border_style="red",
+                padding=(1, 2),
+            )
+        )
+        console.print()
+        sys.exit(1)
+
+    exported_count = 0
+    grammar_count = 0
+    manifest: dict[str, str] = {}
+    used_names: set[str] = set()
+    try:
+        with writer:
+            for note in notes:
+                grammar_count += note.grammar is not None
+
+                filename = _note_filename(config, note, exported_count, used_names)
+
+                base_name = filename.rsplit(".", 1)[0]
+                display_name = base_name[:47] + "..." if len(base_name) > 50 else base_name
+                console.print(
+                    f"[dim]  {display_name} [/dim][dim cyan]\\[{note.extension}][/dim cyan]"
+                )
+
+                out_path = export_path / filename
+                if store is not None:
+                    try:
+                        manifest[filename] = store.add(note.content)
+                        store.link(manifest[filename], out_path)
+                    except OSError as e:
+                        _exit_with_write_error(filename, e)
+                else:
+                    writer.write(filename, note.content)
+
+                exported_count += 1
+            if store is not None:
+                try:
+                    store.write_manifest(export_path, manifest)
+                except OSError as e:
+                    console.print(f"[yellow]⚠ Could not write snapshot manifest: {e}[/yellow]")
+                if config.durable:
+                    try:
+                        store.sync()
+                        fsync_directory(export_path)
+                    except OSError as e:
+                        _exit_with_write_error(export_path.name, e)
+    except NoteWriteError as e:
+        _exit_with_write_error(e.filename, e.error)
+
+    console.print(f"\n[cyan]→ Exported {exported_count} notes[/cyan]")
+    if grammar_count:
+        console.print(f"[cyan]→ {grammar_count} note(s) with explicit grammar/syntax[/cyan]")
+
+    if store is not None:
+        console.print(
+            f"[dim]→ Stored {store.blobs_written} new blob(s) for {exported_count} note(s)[/dim]"
+        )
+
+    console.print(f"\n[bold green]✓ Extracted {exported_count} unsaved notes into:[/bold green]")
+    console.print(f"  [cyan]{export_path}[/cyan]\n")
+
+
+def _watch(config: CliConfig, cache: ExtractionCache | None) -> None:
+    """Re-export changed buffers whenever the LevelDB directory changes, until interrupted.
+
+    The first pass exports every buffer. After that, each settled burst of
+    changes exports only the buffers whose text or grammar differ from the
+    previous pass; unchanged files are served from the in-memory cache.
+    """
+    watcher = open_watcher(config.atom_db_dir)
+    console.print(
+        f"\n[cyan]→ Watching {config.atom_db_dir} ({watcher.name}), press Ctrl+C to stop[/cyan]"
+    )
+
+    exported: dict[bytes, tuple[bytes, str | None]] = {}
+    current: dict[bytes, tuple[bytes, str | None]] = {}
+
+    def changed_notes(notes: Iterable[Note]) -> Iterator[Note]:
+        for note in notes:
+            digest = hashlib.blake2b(note.content, digest_size=16).digest()
+            current[note.buffer_key] = (digest, note.grammar)
+            if exported.get(note.buffer_key) != current[note.buffer_key]:
+                yield note
+
+    try:
+        while True:
+            notes = _read_notes(config, cache)
+            if notes is None:
+                console.print(f"[yellow]⚠ No LevelDB files found in:[/yellow] {config.atom_db_dir}")
+            else:
+                current.clear()
+                changed = changed_notes(notes)
+                first = next(changed, None)
+                if first is not None:
+                    _export_notes(config, itertools.chain([first], changed))
+                else:
+                    console.print("[dim]→ No buffer changed[/dim]")
+                exported = dict(current)
+
+            wait_for_change(watcher, config.debounce)
+    except KeyboardInterrupt:
+        console.print("\n[cyan]→ Stopped watching[/cyan]\n")
+    finally:
+        watcher.close()
+
+
 def main():
     parser = RichArgumentParser(description="Extract unsaved notes from Atom editor's IndexedDB")
     parser.add_argument(
@@ -69,14 +312,113 @@ def main():
         default="txt",
         help="Extension for notes without detected grammar (default: txt)",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of worker processes used to parse LevelDB files (default: CPU count)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory for cached extraction results; unchanged files are not parsed again",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and export changed notes whenever the database changes",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=2.0,
+        help="Seconds the database must stay quiet before a watch-mode export (default: 2)",
+    )
+    parser.add_argument(
+        "--snapshot-store",
+        action="store_true",
+        help="Store each distinct note once under <out-dir>/.blobs and hardlink it into snapshots",
+    )
+    parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="Exit without exporting when the database has not changed since the last run",
+    )
+    parser.add_argument(
+        "--include-grammar",
+        action="append",
+        default=[],
+        metavar="SCOPE",
+        help="Only export notes with this grammar, e.g. source.python (repeatable)",
+    )
+    parser.add_argument(
+        "--exclude-grammar",
+        action="append",
+        default=[],
+        metavar="SCOPE",
+        help="Skip notes with this grammar (repeatable)",
+    )
+    parser.add_argument(
+        "--min-size",
+        type=int,
+        default=None,
+        metavar="BYTES",
+        help="Skip notes whose stored text is smaller than this many bytes",
+    )
+    parser.add_argument(
+        "--max-size",
+        type=int,
+        default=None,
+        metavar="BYTES",
+        help="Skip notes whose stored text is larger than this many bytes",
+    )
+    parser.add_argument(
+        "--match",
+        type=str,
+        default=None,
+        metavar="REGEX",
+        help="Only export notes whose text matches this regular expression",
+    )
+    parser.add_argument(
+        "--stable-names",
+        action="store_true",
+        help="Name files after the note's buffer ID instead of the export counter",
+    )
+    parser.add_argument(
+        "--durable",
+        action="store_true",
+        help="Fsync every exported file and its directory, so exports survive a power loss",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=["dir", *ARCHIVE_FORMATS],
+        default="dir",
+        help="Write a directory of files (default) or a single tar, tar.xz or zip archive per run",
+    )
 
     args = parser.parse_args()
+    _install_log_handler()
 
     try:
         config = CliConfig(
             atom_db_dir=args.atom_db_dir,
             out_dir=args.out_dir,
             force_ext=args.force_ext,
+            jobs=args.jobs,
+            cache_dir=args.cache_dir,
+            watch=args.watch,
+            debounce=args.debounce,
+            snapshot_store=args.snapshot_store,
+            skip_unchanged=args.skip_unchanged,
+            include_grammars=args.include_grammar,
+            exclude_grammars=args.exclude_grammar,
+            min_size=args.min_size,
+            max_size=args.max_size,
+            match=args.match,
+            stable_names=args.stable_names,
+            durable=args.durable,
+            output_format=args.output_format,
         )
     except ValidationError as e:
         console.print()
@@ -160,115 +502,55 @@ def main():
         console.print()
         sys.exit(1)
 
-    files = collect_files(config.atom_db_dir)
-
-    if not files:
-        console.print(f"\n[yellow]⚠ No LevelDB files found in:[/yellow] {config.atom_db_dir}\n")
-        sys.exit(1)
-
-    all_buffers = {}
-    all_grammars = {}
-
-    for path in files:
+    fingerprint = None
+    if config.skip_unchanged and not config.watch:
         try:
-            data = path.read_bytes()
-        except Exception as e:
-            console.print(f"[dim]→ Skipping {path.name}: {e}[/dim]")
-            continue
-
-        buffers = extract_buffers_by_id(data)
-        grammars = extract_buffer_grammars(data)
-
-        for bid, content in buffers.items():
-            if content or bid not in all_buffers:
-                all_buffers[bid] = content
-
-        all_grammars.update(grammars)
-
-    console.print(f"\n[cyan]→ Found {len(all_buffers)} unique buffers[/cyan]")
-    if all_grammars:
-        console.print(
-            f"[cyan]→ Found {len(all_grammars)} buffer(s) with explicit grammar/syntax[/cyan]"
-        )
-
-    console.print("\n[cyan]→ Exporting notes:[/cyan]")
-
-    ts = time.strftime("%Y%m%d-%H%M%S")
-    timestamp_dir = config.out_dir / ts
-    try:
-        timestamp_dir.mkdir(parents=True, exist_ok=True)
-    except OSError as e:
-        error_text = Text()
-        error_text.append("✗ ", style="bold red")
-        error_text.append(f"Failed to create timestamp directory: {timestamp_dir}\n", style="red")
-        error_text.append(f"Error: {e}", style="dim red")
-
-        console.print()
-        console.print(
-            Panel(
-                error_text,
-                title="[bold red]Directory Creation Error[/bold red]",
-                border_style="red",
-                padding=(1, 2),
+            fingerprint = database_fingerprint(
+                config.atom_db_dir,
+                force_ext=config.force_ext,
+                snapshot_store=config.snapshot_store,
+                include_grammars=sorted(config.include_grammars),
+                exclude_grammars=sorted(config.exclude_grammars),
+                min_size=config.min_size,
+                max_size=config.max_size,
+                match=config.match,
+                stable_names=config.stable_names,
+                output_format=config.output_format,
             )
-        )
-        console.print()
-        sys.exit(1)
-
-    exported_count = 0
-    for buffer_id, chunk in all_buffers.items():
-        text = normalize_text(chunk)
-
-        if is_internal_buffer(text):
-            console.print(f"[dim]→ Skipping internal buffer: {buffer_id[:16]}...[/dim]")
-            continue
-
-        grammar = all_grammars.get(buffer_id)
-        if grammar and grammar in GRAMMAR_TO_EXTENSION:
-            ext = GRAMMAR_TO_EXTENSION[grammar]
+        except OSError as e:
+            console.print(f"[dim]→ Could not fingerprint the database: {e}[/dim]")
         else:
-            ext = config.force_ext
+            if load_fingerprint(config.out_dir) == fingerprint:
+                console.print(
+                    "\n[green]✓ Database unchanged since the last run, nothing to export[/green]\n"
+                )
+                return
 
-        first_line = text.splitlines()[0].strip() if text.splitlines() else "note"
-        if not first_line:
-            first_line = "note"
+    cache = None
+    if config.cache_dir is not None or config.watch:
+        try:
+            cache = ExtractionCache(
+                config.cache_dir, config.atom_db_dir, keep_in_memory=config.watch
+            )
+        except OSError as e:
+            console.print(f"[yellow]⚠ Cache disabled, cannot use {config.cache_dir}: {e}[/yellow]")
 
-        slug = re.sub(r"[^a-zA-Z0-9]+", "-", first_line).lower().strip("-")
-        if len(slug) > 60:
-            slug = slug[:60].rstrip("-")
-        if not slug:
-            slug = "note"
-        filename = f"{slug}__{exported_count:03d}.{ext}"
+    if config.watch:
+        _watch(config, cache)
+        return
 
-        base_name = filename.rsplit(".", 1)[0]
-        display_name = base_name[:47] + "..." if len(base_name) > 50 else base_name
-        console.print(f"[dim]  {display_name} [/dim][dim cyan]\\[{ext}][/dim cyan]")
+    notes = _read_notes(config, cache)
+    if notes is None:
+        console.print(f"\n[yellow]⚠ No LevelDB files found in:[/yellow] {config.atom_db_dir}\n")
+        sys.exit(1)
 
-        out_path = timestamp_dir / filename
+    _export_notes(config, notes)
+
+    if fingerprint is not None:
         try:
-            out_path.write_text(text, encoding="utf-8")
+            store_fingerprint(config.out_dir, fingerprint)
         except OSError as e:
-            error_text = Text()
-            error_text.append("✗ ", style="bold red")
-            error_text.append(f"Failed to write file: {filename}\n", style="red")
-            error_text.append(f"Error: {e}", style="dim red")
-
-            console.print()
-            console.print(
-                Panel(
-                    error_text,
-                    title="[bold red]File Write Error[/bold red]",
-                    border_style="red",
-                    padding=(1, 2),
-                )
-            )
-            console.print()
-            sys.exit(1)
-
-        exported_count += 1
-
-    console.print(f"\n[bold green]✓ Extracted {exported_count} unsaved notes into:[/bold green]")
-    console.print(f"  [cyan]{timestamp_dir}[/cyan]\n")
+            console.print(f"[dim]→ Could not store the database fingerprint: {e}[/dim]")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+"""
+Database Fingerprints
+
+A scheduled run usually finds the database exactly as the previous run left
+it. Before anything is parsed, the directory is fingerprinted from the names,
+sizes and modification times of its LevelDB files, plus a checksum of the
+last bytes of every write-ahead log. Logs can be appended to within the
+timestamp granularity of the filesystem, so their tails are checked as well.
+When the fingerprint matches the one stored by the previous run, there is
+nothing new to export.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+import zlib
+
+from .cache import write_json_atomic
+from .utils import CURSOR_CHECKSUM_SPAN
+
+FINGERPRINT_NAME = ".fingerprint.json"
+FINGERPRINT_VERSION = 1
+
+
+def _is_database_file(name: str) -> bool:
+    return (
+        name.endswith((".ldb", ".sst", ".log")) or name.startswith("MANIFEST-") or name == "CURRENT"
+    )
+
+
+def _log_tail_checksum(path: str, size: int) -> int:
+    with open(path, "rb") as f:
+        f.seek(max(0, size - CURSOR_CHECKSUM_SPAN))
+        return zlib.crc32(f.read(CURSOR_CHECKSUM_SPAN))
+
+
+def database_fingerprint(atom_db_dir: Path, **options: Any) -> dict[str, Any]:
+    """Fingerprint the LevelDB files of ``atom_db_dir`` without parsing them.
+
+    ``options`` that change the exported output are folded into the
+    fingerprint, so changing them forces a new export.
+    """
+    files = {}
+    with os.scandir(atom_db_dir) as entries:
+        for entry in entries:
+            if not _is_database_file(entry.name):
+                continue
+            stat = entry.stat()
+            tail = (
+                _log_tail_checksum(entry.path, stat.st_size) if entry.name.endswith(".log") else 0
+            )
+            files[entry.name] = [stat.st_size, stat.st_mtime_ns, tail]
+
+    return {
+        "version": FINGERPRINT_VERSION,
+        "atom_db_dir": str(atom_db_dir),
+        "options": options,
+        "files": files,
+    }
+
+
+def load_fingerprint(out_dir: Path) -> dict[str, Any] | None:
+    """Return the fingerprint stored by the previous run, if any."""
+    try:
+        fingerprint = json.loads((out_dir / FINGERPRINT_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return fingerprint if isinstance(fingerprint, dict) else None
+
+
+def store_fingerprint(out_dir: Path, fingerprint: dict[str, Any]) -> None:
+    """Store the fingerprint of the database state that was just exported."""
+    write_json_atomic(out_dir / FINGERPRINT_NAME, fingerprint)
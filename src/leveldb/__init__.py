@@ -0,0 +1,32 @@
+"""Pure-Python readers for the LevelDB files backing Chromium's IndexedDB."""
+
+from .format import (
+    TABLE_SUFFIXES,
+    TYPE_DELETION,
+    TYPE_VALUE,
+    CorruptionError,
+    Record,
+    decode_varint,
+)
+from .log import iter_log_payloads, iter_log_records, parse_write_batch
+from .manifest import LiveFile, live_files
+from .merge import resolve_records, resolve_source
+from .table import TableReader, iter_table_records
+
+__all__ = [
+    "TABLE_SUFFIXES",
+    "TYPE_DELETION",
+    "TYPE_VALUE",
+    "CorruptionError",
+    "LiveFile",
+    "Record",
+    "TableReader",
+    "decode_varint",
+    "iter_log_payloads",
+    "iter_log_records",
+    "iter_table_records",
+    "live_files",
+    "parse_write_batch",
+    "resolve_records",
+    "resolve_source",
+]
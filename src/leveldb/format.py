@@ -0,0 +1,85 @@
+"""
+LevelDB On-Disk Format Primitives
+
+Shared helpers for the LevelDB readers: varint decoding, masked CRC32C checksums
+and the record type that every reader yields.
+"""
+
+from typing import NamedTuple
+
+TYPE_DELETION = 0
+TYPE_VALUE = 1
+
+TABLE_SUFFIXES = (".ldb", ".sst")
+
+CRC_MASK_DELTA = 0xA282EAD8
+
+
+class CorruptionError(ValueError):
+    """Raised when LevelDB data does not match the expected on-disk format."""
+
+
+class Record(NamedTuple):
+    """A single LevelDB write: user key, value, sequence number and value type.
+
+    Readers hand out values as ``memoryview`` slices of the decoded batch or
+    block where possible, so large values are not copied again.
+    """
+
+    key: bytes
+    value: bytes | memoryview
+    sequence: int
+    value_type: int
+
+
+def decode_varint(data: bytes | memoryview, offset: int) -> tuple[int, int]:
+    """Decode a little-endian base-128 varint, returning (value, next_offset)."""
+    result = 0
+    shift = 0
+    end = len(data)
+
+    while offset < end:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, offset
+        shift += 7
+        if shift > 63:
+            raise CorruptionError("Varint is too long")
+
+    raise CorruptionError("Truncated varint")
+
+
+def _build_crc32c_table() -> list[int]:
+    """Build the lookup table for the Castagnoli polynomial."""
+    table = []
+    for n in range(256):
+        crc = n
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x82F63B78 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC32C_TABLE = _build_crc32c_table()
+
+
+def crc32c(data: bytes | memoryview, crc: int = 0) -> int:
+    """Compute the CRC32C (Castagnoli) checksum used by LevelDB."""
+    table = _CRC32C_TABLE
+    crc ^= 0xFFFFFFFF
+    for byte in bytes(data):
+        crc = table[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
+def unmask_crc(masked: int) -> int:
+    """Reverse the rotation LevelDB applies to stored checksums."""
+    rot = (masked - CRC_MASK_DELTA) & 0xFFFFFFFF
+    return ((rot >> 17) | (rot << 15)) & 0xFFFFFFFF
+
+
+def mask_crc(crc: int) -> int:
+    """Apply the rotation LevelDB uses before storing a checksum."""
+    return (((crc >> 15) | (crc << 17)) + CRC_MASK_DELTA) & 0xFFFFFFFF
@@ -0,0 +1,139 @@
+"""
+LevelDB Write-Ahead Log Reader
+
+A log file is a sequence of 32 KiB blocks. Every logical record is written as one
+FULL fragment or as a FIRST, MIDDLE..., LAST chain when it crosses a block
+boundary, and every fragment carries a 7-byte header (checksum, length, type).
+The reader strips those headers and reassembles the fragments, so callers only
+ever see whole write batches.
+"""
+
+from collections.abc import Iterator
+import struct
+
+from .format import (
+    TYPE_DELETION,
+    TYPE_VALUE,
+    CorruptionError,
+    Record,
+    crc32c,
+    decode_varint,
+    unmask_crc,
+)
+
+BLOCK_SIZE = 32768
+HEADER_SIZE = 7
+
+ZERO_TYPE = 0
+FULL_TYPE = 1
+FIRST_TYPE = 2
+MIDDLE_TYPE = 3
+LAST_TYPE = 4
+
+BATCH_HEADER_SIZE = 12
+
+
+def iter_log_payloads(
+    data: bytes | memoryview, start: int = 0, verify_checksums: bool = False
+) -> Iterator[tuple[int, bytes | memoryview]]:
+    """Yield (end_offset, payload) for every complete logical record in log data.
+
+    ``data`` is typically a ``memoryview`` of a memory-mapped file; records that
+    fit in a single fragment are returned as slices of it without copying.
+    ``start`` must point at the beginning of a physical record. ``end_offset`` is
+    the offset right after the record's last fragment, so it can be used to
+    resume reading later. A record cut off by the end of the data is dropped.
+    """
+    view = memoryview(data)
+    size = len(view)
+    pos = start
+    fragments: list[memoryview] = []
+
+    while pos < size:
+        block_end = min(size, (pos // BLOCK_SIZE + 1) * BLOCK_SIZE)
+
+        while block_end - pos >= HEADER_SIZE:
+            checksum, length, record_type = struct.unpack_from("<IHB", view, pos)
+            if record_type == ZERO_TYPE and length == 0:
+                # Preallocated, never written space: skip the rest of the block
+                break
+
+            data_start = pos + HEADER_SIZE
+            data_end = data_start + length
+            if data_end > size:
+                # Torn write at the end of the file
+                return
+            if data_end > block_end:
+                raise CorruptionError(f"Bad record length at offset {pos}")
+
+            fragment = view[data_start:data_end]
+            if verify_checksums:
+                expected = unmask_crc(checksum)
+                actual = crc32c(fragment, crc32c(bytes([record_type])))
+                if actual != expected:
+                    raise CorruptionError(f"Checksum mismatch at offset {pos}")
+
+            pos = data_end
+
+            if record_type == FULL_TYPE:
+                fragments = []
+                yield pos, fragment
+            elif record_type == FIRST_TYPE:
+                fragments = [fragment]
+            elif record_type == MIDDLE_TYPE:
+                if fragments:
+                    fragments.append(fragment)
+            elif record_type == LAST_TYPE:
+                if fragments:
+                    fragments.append(fragment)
+                    yield pos, b"".join(fragments)
+                    fragments = []
+            else:
+                raise CorruptionError(f"Unknown record type {record_type} at {pos}")
+
+        pos = block_end
+
+
+def parse_write_batch(payload: bytes | memoryview) -> Iterator[Record]:
+    """Decode the puts and deletions stored in a single write batch."""
+    if len(payload) < BATCH_HEADER_SIZE:
+        raise CorruptionError("Write batch is too small")
+
+    sequence, count = struct.unpack_from("<QI", payload, 0)
+    view = memoryview(payload)
+    pos = BATCH_HEADER_SIZE
+    end = len(payload)
+
+    for index in range(count):
+        if pos >= end:
+            raise CorruptionError("Write batch has fewer entries than its header claims")
+
+        value_type = payload[pos]
+        pos += 1
+
+        key_length, pos = decode_varint(payload, pos)
+        key = bytes(view[pos : pos + key_length])
+        pos += key_length
+
+        value: bytes | memoryview
+        if value_type == TYPE_VALUE:
+            value_length, pos = decode_varint(payload, pos)
+            value = view[pos : pos + value_length]
+            pos += value_length
+        elif value_type == TYPE_DELETION:
+            value = b""
+        else:
+            raise CorruptionError(f"Unknown write batch tag {value_type}")
+
+        if pos > end:
+            raise CorruptionError("Write batch entry runs past the end of the record")
+
+        yield Record(key, value, sequence + index, value_type)
+
+
+def iter_log_records(
+    data: bytes | memoryview, start: int = 0, verify_checksums: bool = False
+) -> Iterator[Record]:
+    """Yield every put and deletion stored in LevelDB log data, in write order."""
+    for _, payload in iter_log_payloads(data, start, verify_checksums):
+        yield from parse_write_batch(payload)
@@ -0,0 +1,156 @@
+"""
+MANIFEST-Driven Live File Discovery
+
+``CURRENT`` names the active ``MANIFEST-*`` file, a log of version edits that
+add and remove tables as compactions run. Replaying the edits gives the set
+of live tables with their level and key range, plus the oldest log file that
+still holds unflushed writes. Files not in that set are obsolete leftovers
+that compaction has not deleted yet.
+"""
+
+from pathlib import Path
+from typing import NamedTuple
+
+from .format import TABLE_SUFFIXES, CorruptionError, decode_varint
+from .log import iter_log_payloads
+from .table import parse_internal_key
+
+TAG_COMPARATOR = 1
+TAG_LOG_NUMBER = 2
+TAG_NEXT_FILE_NUMBER = 3
+TAG_LAST_SEQUENCE = 4
+TAG_COMPACT_POINTER = 5
+TAG_DELETED_FILE = 6
+TAG_NEW_FILE = 7
+TAG_PREV_LOG_NUMBER = 9
+
+LOG_LEVEL = -1
+
+
+class LiveFile(NamedTuple):
+    """A file the current database version still reads from.
+
+    Log files have level ``LOG_LEVEL`` and an empty key range.
+    """
+
+    path: Path
+    number: int
+    level: int
+    smallest: bytes
+    largest: bytes
+
+
+class _TableMeta(NamedTuple):
+    level: int
+    smallest: bytes
+    largest: bytes
+
+
+class VersionState:
+    """Database version rebuilt by replaying MANIFEST edits."""
+
+    def __init__(self) -> None:
+        self.log_number = 0
+        self.prev_log_number = 0
+        self.last_sequence = 0
+        self.tables: dict[int, _TableMeta] = {}
+
+    def apply(self, edit: bytes | memoryview) -> None:
+        """Apply a single serialized version edit."""
+        pos = 0
+        end = len(edit)
+
+        while pos < end:
+            tag, pos = decode_varint(edit, pos)
+
+            if tag == TAG_COMPARATOR:
+                _, pos = _read_slice(edit, pos)
+            elif tag == TAG_LOG_NUMBER:
+                self.log_number, pos = decode_varint(edit, pos)
+            elif tag == TAG_PREV_LOG_NUMBER:
+                self.prev_log_number, pos = decode_varint(edit, pos)
+            elif tag == TAG_NEXT_FILE_NUMBER:
+                _, pos = decode_varint(edit, pos)
+            elif tag == TAG_LAST_SEQUENCE:
+                self.last_sequence, pos = decode_varint(edit, pos)
+            elif tag == TAG_COMPACT_POINTER:
+                _, pos = decode_varint(edit, pos)
+                _, pos = _read_slice(edit, pos)
+            elif tag == TAG_DELETED_FILE:
+                _, pos = decode_varint(edit, pos)
+                number, pos = decode_varint(edit, pos)
+                self.tables.pop(number, None)
+            elif tag == TAG_NEW_FILE:
+                level, pos = decode_varint(edit, pos)
+                number, pos = decode_varint(edit, pos)
+                _, pos = decode_varint(edit, pos)
+                smallest, pos = _read_slice(edit, pos)
+                largest, pos = _read_slice(edit, pos)
+                self.tables[number] = _TableMeta(
+                    level, parse_internal_key(smallest)[0], parse_internal_key(largest)[0]
+                )
+            else:
+                raise CorruptionError(f"Unknown version edit tag {tag}")
+
+
+def _read_slice(data: bytes | memoryview, pos: int) -> tuple[bytes, int]:
+    """Read a length-prefixed byte string."""
+    length, pos = decode_varint(data, pos)
+    if pos + length > len(data):
+        raise CorruptionError("Slice runs past the end of the version edit")
+    return bytes(data[pos : pos + length]), pos + length
+
+
+def read_version(db_dir: Path) -> VersionState | None:
+    """Replay the MANIFEST named by ``CURRENT``, or return None if there is none."""
+    current = db_dir / "CURRENT"
+    if not current.is_file():
+        return None
+
+    manifest_name = current.read_text(encoding="utf-8", errors="replace").strip()
+    manifest = db_dir / manifest_name
+    if not manifest_name.startswith("MANIFEST-") or not manifest.is_file():
+        return None
+
+    version = VersionState()
+    for _, edit in iter_log_payloads(manifest.read_bytes()):
+        version.apply(edit)
+
+    return version
+
+
+def _file_number(path: Path) -> int | None:
+    """Parse the file number from a name like ``000123.ldb``."""
+    return int(path.stem) if path.stem.isdigit() else None
+
+
+def live_files(db_dir: Path) -> list[LiveFile] | None:
+    """List the live files of a LevelDB directory, newest data first.
+
+    Order matches LevelDB's read precedence: log files by descending number,
+    then level-0 tables by descending number, then deeper levels. Returns None
+    when the directory has no readable ``CURRENT``/``MANIFEST`` pair.
+    """
+    version = read_version(db_dir)
+    if version is None:
+        return None
+
+    logs: list[LiveFile] = []
+    for path in db_dir.glob("*.log"):
+        number = _file_number(path)
+        if number is None:
+            continue
+        if number >= version.log_number or number == version.prev_log_number:
+            logs.append(LiveFile(path, number, LOG_LEVEL, b"", b""))
+
+    tables: list[LiveFile] = []
+    for number, meta in version.tables.items():
+        for suffix in TABLE_SUFFIXES:
+            path = db_dir / f"{number:06d}{suffix}"
+            if path.is_file():
+                tables.append(LiveFile(path, number, meta.level, meta.smallest, meta.largest))
+                break
+
+    logs.sort(key=lambda f: f.number, reverse=True)
+    tables.sort(key=lambda f: (f.level, -f.number if f.level == 0 else f.number))
+    return logs + tables
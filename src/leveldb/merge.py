@@ -0,0 +1,82 @@
+"""
+Newest-Write-Wins Resolution
+
+LevelDB may hold several versions of the same user key: older ones in deeper
+table levels, newer ones in level-0 tables or the write-ahead log. The version
+with the highest sequence number is the live one, and a deletion tombstone
+hides every older value of its key.
+
+Files read in LevelDB's read precedence (logs, then level-0 tables newest
+first, then deeper levels) meet every key's newest version first, which lets
+the resolution be streamed file by file with ``resolve_source``. When the
+precedence is unknown, ``resolve_records`` compares sequence numbers across
+all sources instead.
+"""
+
+from collections.abc import Iterable
+from operator import attrgetter
+from typing import Protocol
+
+from .format import TYPE_VALUE
+
+
+class VersionedEntry(Protocol):
+    """Anything carrying a LevelDB user key, sequence number and value type."""
+
+    @property
+    def key(self) -> bytes: ...
+
+    @property
+    def sequence(self) -> int: ...
+
+    @property
+    def value_type(self) -> int: ...
+
+
+def resolve_records[EntryT: VersionedEntry](sources: Iterable[Iterable[EntryT]]) -> list[EntryT]:
+    """Resolve every user key to its newest write across all sources.
+
+    All sources are consumed in a single pass that keeps only the highest
+    sequence number seen per key. Chromium's IndexedDB tables are ordered by
+    its own key comparator rather than bytewise, so a key-ordered heap merge
+    would need that comparator; tracking the newest sequence per key does not.
+
+    Entries can be raw records or anything derived from them that keeps the
+    key, sequence number and value type. Keys whose newest write is a deletion
+    are dropped. The live entries are returned newest first; entries with equal
+    sequence numbers keep the order of their sources.
+    """
+    newest: dict[bytes, EntryT] = {}
+
+    for source in sources:
+        for record in source:
+            current = newest.get(record.key)
+            if current is None or record.sequence > current.sequence:
+                newest[record.key] = record
+
+    live = [record for record in newest.values() if record.value_type == TYPE_VALUE]
+    live.sort(key=attrgetter("sequence"), reverse=True)
+    return live
+
+
+def resolve_source[EntryT: VersionedEntry](
+    source: Iterable[EntryT], hidden: set[bytes]
+) -> list[EntryT]:
+    """Resolve one source of a read-precedence stream against the sources before it.
+
+    Keys in ``hidden`` were already resolved by an earlier source and are
+    skipped; the keys of this source are added to it. The live entries are
+    returned newest first.
+    """
+    newest: dict[bytes, EntryT] = {}
+    for record in source:
+        if record.key in hidden:
+            continue
+        current = newest.get(record.key)
+        if current is None or record.sequence > current.sequence:
+            newest[record.key] = record
+
+    hidden.update(newest)
+    live = [record for record in newest.values() if record.value_type == TYPE_VALUE]
+    live.sort(key=attrgetter("sequence"), reverse=True)
+    return live
@@ -0,0 +1,73 @@
+"""
+Snappy Decompression
+
+Pure-Python decoder for the raw Snappy format LevelDB uses for table blocks.
+A stream is the uncompressed length as a varint followed by literal runs and
+back-references into the output produced so far.
+"""
+
+from .format import CorruptionError, decode_varint
+
+LITERAL = 0
+COPY_1_BYTE_OFFSET = 1
+COPY_2_BYTE_OFFSET = 2
+COPY_4_BYTE_OFFSET = 3
+
+
+def decompress(data: bytes | memoryview) -> bytes:
+    """Decompress a raw (unframed) Snappy buffer."""
+    expected_length, pos = decode_varint(data, 0)
+    end = len(data)
+    out = bytearray()
+
+    while pos < end:
+        tag = data[pos]
+        pos += 1
+        element_type = tag & 0x03
+
+        if element_type == LITERAL:
+            size = tag >> 2
+            if size >= 60:
+                extra = size - 59
+                size = int.from_bytes(data[pos : pos + extra], "little")
+                pos += extra
+            size += 1
+            if pos + size > end:
+                raise CorruptionError("Snappy literal runs past the end of the input")
+            out += data[pos : pos + size]
+            pos += size
+            continue
+
+        if element_type == COPY_1_BYTE_OFFSET:
+            size = ((tag >> 2) & 0x07) + 4
+            if pos >= end:
+                raise CorruptionError("Invalid Snappy back-reference")
+            offset = ((tag >> 5) << 8) | data[pos]
+            pos += 1
+        elif element_type == COPY_2_BYTE_OFFSET:
+            size = (tag >> 2) + 1
+            offset = int.from_bytes(data[pos : pos + 2], "little")
+            pos += 2
+        else:
+            size = (tag >> 2) + 1
+            offset = int.from_bytes(data[pos : pos + 4], "little")
+            pos += 4
+
+        if pos > end or offset == 0 or offset > len(out):
+            raise CorruptionError("Invalid Snappy back-reference")
+
+        start = len(out) - offset
+        if size <= offset:
+            out += out[start : start + size]
+        else:
+            # Overlapping copy: the referenced run repeats itself
+            pattern = out[start:]
+            repeats, remainder = divmod(size, offset)
+            out += pattern * repeats + pattern[:remainder]
+
+    if len(out) != expected_length:
+        raise CorruptionError(
+            f"Snappy output has {len(out)} bytes, header announced {expected_length}"
+        )
+
+    return bytes(out)
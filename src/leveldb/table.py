@@ -0,0 +1,143 @@
+"""
+LevelDB Table (.ldb) Reader
+
+A table ends with a fixed 48-byte footer pointing at the index block. Each index
+entry points at one data block, and every block may be Snappy-compressed.
+Data blocks hold prefix-compressed internal keys (user key plus an 8-byte
+sequence/type trailer) followed by a restart array.
+
+Blocks are read and decompressed only when iteration reaches them.
+"""
+
+from collections.abc import Iterator
+import struct
+from typing import NamedTuple
+
+from . import snappy
+from .format import CorruptionError, Record, crc32c, decode_varint, unmask_crc
+
+FOOTER_SIZE = 48
+TABLE_MAGIC = 0xDB4775248B80FB57
+BLOCK_TRAILER_SIZE = 5
+
+NO_COMPRESSION = 0
+SNAPPY_COMPRESSION = 1
+
+
+class BlockHandle(NamedTuple):
+    """Location of a block inside a table file."""
+
+    offset: int
+    size: int
+
+
+def decode_block_handle(data: bytes | memoryview, offset: int = 0) -> tuple[BlockHandle, int]:
+    """Decode a varint-encoded block handle, returning (handle, next_offset)."""
+    block_offset, offset = decode_varint(data, offset)
+    block_size, offset = decode_varint(data, offset)
+    return BlockHandle(block_offset, block_size), offset
+
+
+def iter_block_entries(block: bytes | memoryview) -> Iterator[tuple[bytes, memoryview]]:
+    """Yield the (key, value) pairs of a decompressed block, undoing prefix compression.
+
+    Values are ``memoryview`` slices of ``block``.
+    """
+    if len(block) < 4:
+        raise CorruptionError("Block is too small")
+
+    (num_restarts,) = struct.unpack_from("<I", block, len(block) - 4)
+    entries_end = len(block) - 4 * (num_restarts + 1)
+    if entries_end < 0:
+        raise CorruptionError("Block restart array is larger than the block")
+
+    view = memoryview(block)
+    pos = 0
+    key = b""
+    while pos < entries_end:
+        shared, pos = decode_varint(block, pos)
+        non_shared, pos = decode_varint(block, pos)
+        value_length, pos = decode_varint(block, pos)
+
+        if shared > len(key) or pos + non_shared + value_length > entries_end:
+            raise CorruptionError("Bad block entry")
+
+        key = key[:shared] + block[pos : pos + non_shared]
+        pos += non_shared
+        yield key, view[pos : pos + value_length]
+        pos += value_length
+
+
+def parse_internal_key(internal_key: bytes) -> tuple[bytes, int, int]:
+    """Split an internal key into (user_key, sequence, value_type)."""
+    if len(internal_key) < 8:
+        raise CorruptionError("Internal key is too short")
+
+    (trailer,) = struct.unpack_from("<Q", internal_key, len(internal_key) - 8)
+    return internal_key[:-8], trailer >> 8, trailer & 0xFF
+
+
+class TableReader:
+    """Lazy reader for a single LevelDB table.
+
+    ``data`` is typically a ``memoryview`` of a memory-mapped file, so
+    uncompressed blocks are parsed in place.
+    """
+
+    def __init__(self, data: bytes | memoryview, verify_checksums: bool = False):
+        self._data = memoryview(data)
+        self._verify_checksums = verify_checksums
+
+        file_size = len(self._data)
+        if file_size < FOOTER_SIZE:
+            raise CorruptionError("File is too small to be a LevelDB table")
+
+        footer = self._data[file_size - FOOTER_SIZE :]
+
+        (magic,) = struct.unpack_from("<Q", footer, FOOTER_SIZE - 8)
+        if magic != TABLE_MAGIC:
+            raise CorruptionError("Bad table magic number")
+
+        _, offset = decode_block_handle(footer)
+        self.index_handle, _ = decode_block_handle(footer, offset)
+
+    def read_block(self, handle: BlockHandle) -> bytes | memoryview:
+        """Verify and, if needed, decompress the block at ``handle``."""
+        raw = self._data[handle.offset : handle.offset + handle.size + BLOCK_TRAILER_SIZE]
+        if len(raw) != handle.size + BLOCK_TRAILER_SIZE:
+            raise CorruptionError("Truncated block")
+
+        data = raw[: handle.size]
+        compression = raw[handle.size]
+
+        if self._verify_checksums:
+            (checksum,) = struct.unpack_from("<I", raw, handle.size + 1)
+            if crc32c(raw[: handle.size + 1]) != unmask_crc(checksum):
+                raise CorruptionError(f"Block checksum mismatch at offset {handle.offset}")
+
+        if compression == NO_COMPRESSION:
+            return data
+        if compression == SNAPPY_COMPRESSION:
+            return snappy.decompress(data)
+
+        raise CorruptionError(f"Unsupported block compression type {compression}")
+
+    def iter_block_handles(self) -> Iterator[BlockHandle]:
+        """Yield the handles of all data blocks, in key order."""
+        for _, value in iter_block_entries(self.read_block(self.index_handle)):
+            handle, _ = decode_block_handle(value)
+            yield handle
+
+    def __iter__(self) -> Iterator[Record]:
+        """Yield every entry of the table, decoding one data block at a time."""
+        for handle in self.iter_block_handles():
+            for internal_key, value in iter_block_entries(self.read_block(handle)):
+                user_key, sequence, value_type = parse_internal_key(internal_key)
+                yield Record(user_key, value, sequence, value_type)
+
+
+def iter_table_records(
+    data: bytes | memoryview, verify_checksums: bool = False
+) -> Iterator[Record]:
+    """Yield every put and deletion stored in LevelDB table data."""
+    yield from TableReader(data, verify_checksums)
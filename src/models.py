@@ -1,11 +1,25 @@
 from pathlib import Path
-from typing import Annotated
+import re
+from typing import Annotated, Literal
 
-from pydantic import BaseModel, BeforeValidator, field_validator, model_validator
+from pydantic import (
+    BaseModel,
+    BeforeValidator,
+    Field,
+    ValidationInfo,
+    field_validator,
+    model_validator,
+)
 
 from src.constants import GRAMMAR_TO_EXTENSION
 
-from .utils import expand_path, validate_and_expand_atom_db_dir
+from .utils import (
+    default_jobs,
+    expand_optional_path,
+    expand_path,
+    validate_and_expand_atom_db_dir,
+    validate_jobs,
+)
 
 
 class CliConfig(BaseModel):
@@ -14,6 +28,20 @@ class CliConfig(BaseModel):
     atom_db_dir: Annotated[Path, BeforeValidator(validate_and_expand_atom_db_dir)]
     out_dir: Annotated[Path, BeforeValidator(expand_path)]
     force_ext: str = "txt"
+    jobs: Annotated[int, BeforeValidator(validate_jobs)] = Field(default_factory=default_jobs)
+    cache_dir: Annotated[Path | None, BeforeValidator(expand_optional_path)] = None
+    watch: bool = False
+    debounce: float = 2.0
+    snapshot_store: bool = False
+    skip_unchanged: bool = False
+    include_grammars: list[str] = Field(default_factory=list)
+    exclude_grammars: list[str] = Field(default_factory=list)
+    min_size: int | None = None
+    max_size: int | None = None
+    match: str | None = None
+    stable_names: bool = False
+    durable: bool = False
+    output_format: Literal["dir", "tar", "tar.xz", "zip"] = "dir"
 
     @field_validator("force_ext", mode="before")
     def validate_force_ext(cls, value: str) -> str:
@@ -32,6 +60,47 @@ class CliConfig(BaseModel):
 
         return clean_string
 
+    @field_validator("debounce", mode="after")
+    def validate_debounce(cls, value: float) -> float:
+        """Validate the watch-mode debounce interval."""
+        if value < 0:
+            raise ValueError(f"Debounce interval cannot be negative, got {value}")
+
+        return value
+
+    @field_validator("min_size", "max_size", mode="after")
+    def validate_size(cls, value: int | None, info: ValidationInfo) -> int | None:
+        """Validate the note size bounds."""
+        if value is None:
+            return value
+        if value < 0:
+            raise ValueError(f"Size cannot be negative, got {value}")
+
+        min_size = info.data.get("min_size")
+        if info.field_name == "max_size" and min_size is not None and value < min_size:
+            raise ValueError(f"Maximum size {value} is smaller than minimum size {min_size}")
+
+        return value
+
+    @field_validator("match", mode="after")
+    def validate_match(cls, value: str | None) -> str | None:
+        """Validate the note text pattern."""
+        if value is not None:
+            try:
+                re.compile(value)
+            except re.error as e:
+                raise ValueError(f"Invalid regular expression '{value}': {e}") from e
+
+        return value
+
+    @field_validator("output_format", mode="after")
+    def validate_output_format(cls, value: str, info: ValidationInfo) -> str:
+        """Validate that the output format can hold the requested export."""
+        if value != "dir" and info.data.get("snapshot_store"):
+            raise ValueError(f"Snapshot store exports cannot be written as {value} archives")
+
+        return value
+
     @model_validator(mode="after")
     def validate_atom_db_has_files(self) -> "CliConfig":
         """Verify atom_db_dir contains LevelDB files."""
@@ -0,0 +1,463 @@
+"""
+Note Reading API
+
+``iter_notes`` is the library entry point behind the CLI: it reads the live
+files of an Atom IndexedDB directory and streams every unsaved note as a
+``Note`` record, newest version only, as soon as it is resolved. It writes
+nothing and prints nothing; progress and skipped files are reported through
+the ``logging`` module, and file naming and writing are left to the caller.
+
+    from src.notes import iter_notes
+
+    for note in iter_notes("~/Library/Application Support/Atom/IndexedDB/..."):
+        print(note.buffer_id, note.extension, len(note.content))
+"""
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+import logging
+import multiprocessing
+from pathlib import Path
+import re
+import sys
+from typing import NamedTuple
+
+from .cache import ExtractionCache, file_identity
+from .constants import GRAMMAR_TO_EXTENSION
+from .leveldb import CorruptionError, resolve_records, resolve_source
+from .utils import (
+    INTERNAL_MARKER_SPAN,
+    ExtractedRecord,
+    FileExtraction,
+    IndexedRecord,
+    expand_path,
+    extract_file_records,
+    index_file_records,
+    is_internal_buffer,
+    locate_files,
+    read_file_texts,
+)
+
+logger = logging.getLogger(__name__)
+
+PARSE_AHEAD_PER_JOB = 2
+
+
+class Note(NamedTuple):
+    """The current version of one unsaved note.
+
+    ``content`` is the note text as cleaned UTF-8, ready to be written as is;
+    ``text`` decodes it on each access. ``source`` and ``sequence`` record
+    where the text was read from: the LevelDB file and the sequence number
+    of the write that stored it.
+
+    Notes are slotted tuples that carry the buffer ID as 16 raw bytes, and
+    grammar and extension strings are interned, so holding many of them costs
+    little more than their text.
+    """
+
+    buffer_key: bytes
+    content: bytes
+    grammar: str | None
+    extension: str
+    source: Path
+    sequence: int
+
+    @property
+    def buffer_id(self) -> str:
+        """The buffer ID as Atom writes it: 32 lowercase hex digits."""
+        return self.buffer_key.hex()
+
+    @property
+    def text(self) -> str:
+        """The note text, decoded from ``content``."""
+        return self.content.decode("utf-8", errors="replace")
+
+
+class NoteFilter(NamedTuple):
+    """Which notes to keep, decided before their text is decoded where possible.
+
+    Grammar and size are checked against the file indexes, which list every
+    buffer with the stored size of its text in bytes, so rejected buffers
+    are never decoded. Only the remaining ones are decoded and matched
+    against ``pattern``. With ``include_grammars``, notes without a grammar
+    are skipped. A cache still extracts every buffer of a file it stores,
+    since its entries serve any filter.
+    """
+
+    include_grammars: frozenset[str] = frozenset()
+    exclude_grammars: frozenset[str] = frozenset()
+    min_size: int | None = None
+    max_size: int | None = None
+    pattern: re.Pattern[str] | None = None
+
+    def accepts_raw(self, grammar: str | None, size: int) -> bool:
+        """Check the conditions that do not need the note text, given its stored size."""
+        if self.include_grammars and grammar not in self.include_grammars:
+            return False
+        if grammar in self.exclude_grammars:
+            return False
+        if self.min_size is not None and size < self.min_size:
+            return False
+        return self.max_size is None or size <= self.max_size
+
+    def accepts_text(self, text: str) -> bool:
+        """Check the conditions on the decoded note text."""
+        return self.pattern is None or self.pattern.search(text) is not None
+
+
+def _worker_context() -> multiprocessing.context.BaseContext:
+    """Start method for parser processes that does not fork the calling thread."""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _done[T](result: T) -> Future[T]:
+    future: Future[T] = Future()
+    future.set_result(result)
+    return future
+
+
+def _parse_files[T](
+    tasks: Iterable[tuple[Path, Callable[[], T] | Future[T]]], jobs: int
+) -> Iterator[tuple[Path, T | None]]:
+    """Run per-file parse tasks in worker processes and yield results in task order.
+
+    Tasks are consumed lazily and at most ``PARSE_AHEAD_PER_JOB`` files per
+    job are in flight, so parsed files never pile up ahead of the consumer.
+    A task is a picklable callable, or a future that already holds a result,
+    which is passed through in order. Files that cannot be read or are
+    corrupt are logged and yielded with None; anything else, such as a broken
+    worker pool, is raised.
+
+    The CLI runs this generator on a producer thread (see ``bounded``), and
+    forking a multi-threaded process can deadlock the child, so workers come
+    from a fork server where available instead of being forked.
+    """
+    executor = (
+        ProcessPoolExecutor(max_workers=jobs, mp_context=_worker_context()) if jobs > 1 else None
+    )
+    limit = jobs * PARSE_AHEAD_PER_JOB if executor is not None else 1
+    window: deque[tuple[Path, Future[T]]] = deque()
+
+    def next_result() -> tuple[Path, T | None]:
+        path, future = window.popleft()
+        try:
+            return path, future.result()
+        except (OSError, CorruptionError) as e:
+            logger.info("Skipping %s: %s", path.name, e)
+            return path, None
+
+    try:
+        for path, task in tasks:
+            if isinstance(task, Future):
+                future = task
+            elif executor is None:
+                future = Future()
+                try:
+                    future.set_result(task())
+                except (OSError, CorruptionError) as e:
+                    future.set_exception(e)
+            else:
+                future = executor.submit(task)
+
+            window.append((path, future))
+            while len(window) >= limit:
+                yield next_result()
+
+        while window:
+            yield next_result()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def _extract_files(
+    files: list[Path], jobs: int, cache: ExtractionCache
+) -> Iterator[tuple[Path, list[ExtractedRecord]]]:
+    """Yield the extraction results of every file in file order, reusing cached results.
+
+    Logs that only grew since the last run are parsed from their cached cursor.
+    """
+    identities = {}
+    resumable = {}
+    reused = set()
+
+    def tasks() -> Iterator[tuple[Path, Callable[[], FileExtraction] | Future[FileExtraction]]]:
+        for path in files:
+            if (cached_records := cache.get(path)) is not None:
+                reused.add(path)
+                yield path, _done(FileExtraction(cached_records, None, False))
+                continue
+
+            try:
+                identities[path] = file_identity(path)
+            except OSError as e:
+                failed: Future[FileExtraction] = Future()
+                failed.set_exception(e)
+                yield path, failed
+                continue
+            if path.suffix == ".log" and (cached := cache.get_resumable(path)) is not None:
+                resumable[path] = cached
+            cursor = resumable[path][1] if path in resumable else None
+            yield path, partial(extract_file_records, path, cursor)
+
+    for path, extraction in _parse_files(tasks(), jobs):
+        if extraction is None:
+            continue
+
+        records = extraction.records
+        if path not in reused:
+            if extraction.resumed:
+                cached_records, cursor = resumable[path]
+                logger.info("Resumed %s at byte %d", path.name, cursor.offset)
+                records = cached_records + records
+
+            if path in identities:
+                try:
+                    cache.put(path, identities[path], records, extraction.cursor)
+                except OSError as e:
+                    logger.info("Could not cache results for %s: %s", path.name, e)
+
+        yield path, records
+
+    logger.info("Reused cached results for %d of %d files", len(reused), len(files))
+    cache.prune(files)
+
+
+def _index_files(
+    files: list[Path], jobs: int, cache: ExtractionCache | None
+) -> Iterator[tuple[Path, list[IndexedRecord]]]:
+    """Yield the index of every file in file order.
+
+    Without a cache, files are indexed without decoding any text. A cache
+    holds complete extraction results, so with one, files that are not
+    cached yet are extracted in full, and their texts are later read back
+    from the cache instead of from the file.
+    """
+    if cache is None:
+        tasks = ((path, partial(index_file_records, path)) for path in files)
+        for path, index in _parse_files(tasks, jobs):
+            if index is not None:
+                yield path, index
+        return
+
+    for path, records in _extract_files(files, jobs, cache):
+        index = [
+            IndexedRecord(
+                record.key, record.sequence, record.value_type, record.sizes, record.grammars
+            )
+            for record in records
+        ]
+        yield path, index
+
+
+class _SourcedRecord(NamedTuple):
+    record: IndexedRecord
+    source: Path
+
+    @property
+    def key(self) -> bytes:
+        return self.record.key
+
+    @property
+    def sequence(self) -> int:
+        return self.record.sequence
+
+    @property
+    def value_type(self) -> int:
+        return self.record.value_type
+
+
+def _iter_live_records(
+    sources: Iterable[tuple[Path, list[IndexedRecord]]], in_read_precedence: bool
+) -> Iterator[tuple[Path, IndexedRecord]]:
+    """Yield the newest live record of every key, with the file it came from.
+
+    Sources in real read precedence are resolved one at a time, as files are
+    indexed. Otherwise a later file may still hold a newer write, and every
+    key is resolved by sequence number across all sources.
+    """
+    if in_read_precedence:
+        hidden_keys: set[bytes] = set()
+        for path, records in sources:
+            for record in resolve_source(records, hidden_keys):
+                yield path, record
+        return
+
+    sourced = ((_SourcedRecord(record, path) for record in records) for path, records in sources)
+    for entry in resolve_records(sourced):
+        yield entry.source, entry.record
+
+
+class _NotePlan(NamedTuple):
+    """Where the current text of every note is, and which grammar it has."""
+
+    grammars: dict[str, str]
+    wanted: dict[Path, dict[tuple[bytes, int], list[str]]]
+
+
+def _plan_notes(
+    sources: Iterable[tuple[Path, list[IndexedRecord]]],
+    in_read_precedence: bool,
+    since: int | None,
+    note_filter: NoteFilter,
+) -> _NotePlan:
+    """Resolve the index of every file into the records whose texts are wanted.
+
+    Live records arrive newest first, so the first record listing a buffer
+    holds its current text; older ones are never read. A grammar is usually
+    set once, long before the latest edit, so grammars are resolved across
+    all records, the newest assignment winning. Buffers the filter rejects
+    by grammar or stored size are dropped from the plan, so their texts are
+    never decoded, while their newest version still hides the older ones.
+    """
+    seen: set[str] = set()
+    sizes: dict[str, int] = {}
+    grammars: dict[str, tuple[int, str]] = {}
+    wanted: dict[Path, dict[tuple[bytes, int], list[str]]] = {}
+
+    for path, record in _iter_live_records(sources, in_read_precedence):
+        for bid, grammar in record.grammars.items():
+            current = grammars.get(bid)
+            if current is None or record.sequence > current[0]:
+                grammars[bid] = (record.sequence, grammar)
+
+        for bid, size in record.buffers.items():
+            if bid in seen:
+                continue
+            seen.add(bid)
+            if since is not None and record.sequence <= since:
+                continue
+            sizes[bid] = size
+            file_wanted = wanted.setdefault(path, {})
+            file_wanted.setdefault((record.key, record.sequence), []).append(bid)
+
+    resolved = {bid: sys.intern(grammar) for bid, (_, grammar) in grammars.items()}
+    accepted: dict[Path, dict[tuple[bytes, int], list[str]]] = {}
+    for path, file_wanted in wanted.items():
+        for record_id, buffer_ids in file_wanted.items():
+            kept = [
+                bid for bid in buffer_ids if note_filter.accepts_raw(resolved.get(bid), sizes[bid])
+            ]
+            if kept:
+                accepted.setdefault(path, {})[record_id] = kept
+
+    return _NotePlan(resolved, accepted)
+
+
+def _cached_texts(
+    records: list[ExtractedRecord], wanted: dict[tuple[bytes, int], list[str]]
+) -> dict[str, bytes | None]:
+    texts: dict[str, bytes | None] = {}
+    for record in records:
+        for bid in wanted.get((record.key, record.sequence), ()):
+            if bid in record.buffers:
+                content = record.buffers[bid]
+                head = content[:INTERNAL_MARKER_SPAN].decode("utf-8", errors="replace")
+                texts[bid] = None if is_internal_buffer(head) else content
+    return texts
+
+
+def _resolve_notes(
+    sources: Iterable[tuple[Path, list[IndexedRecord]]],
+    in_read_precedence: bool,
+    jobs: int,
+    cache: ExtractionCache | None,
+    default_extension: str,
+    since: int | None,
+    note_filter: NoteFilter,
+) -> Iterator[Note]:
+    """Yield every buffer once, from the newest record that carries it.
+
+    The indexes of all files are resolved first; they hold no texts and are
+    small. Texts are then read file by file, only for the buffers whose
+    current version passes the grammar and size filters, and each note is
+    yielded as soon as its file is read. Internal buffers are recognized from
+    the head of their text before the rest is decoded. Buffer IDs are kept
+    as 16-byte binary IDs, with grammar names interned.
+    """
+    plan = _plan_notes(sources, in_read_precedence, since, note_filter)
+    default_extension = sys.intern(default_extension)
+
+    def tasks() -> Iterator[
+        tuple[Path, Callable[[], dict[str, bytes | None]] | Future[dict[str, bytes | None]]]
+    ]:
+        for path, records in plan.wanted.items():
+            if cache is not None and (cached := cache.get(path)) is not None:
+                yield path, _done(_cached_texts(cached, records))
+            else:
+                yield path, partial(read_file_texts, path, records)
+
+    for path, texts in _parse_files(tasks(), jobs):
+        if texts is None:
+            continue
+
+        for (_, sequence), buffer_ids in plan.wanted[path].items():
+            for bid in buffer_ids:
+                if bid not in texts:
+                    continue
+                content = texts[bid]
+                if content is None:
+                    logger.info("Skipping internal buffer: %s...", bid[:16])
+                    continue
+                # Only a pattern needs the text decoded; the note keeps its UTF-8 bytes
+                if note_filter.pattern is not None and not note_filter.accepts_text(
+                    content.decode("utf-8", errors="replace")
+                ):
+                    continue
+
+                grammar = plan.grammars.get(bid)
+                extension = GRAMMAR_TO_EXTENSION.get(grammar or "", default_extension)
+                yield Note(
+                    bytes.fromhex(bid), content, grammar, sys.intern(extension), path, sequence
+                )
+
+
+def iter_notes(
+    atom_db_dir: str | Path,
+    *,
+    jobs: int = 1,
+    since: int | None = None,
+    default_extension: str = "txt",
+    cache: ExtractionCache | None = None,
+    note_filter: NoteFilter | None = None,
+) -> Iterator[Note]:
+    """Stream the unsaved notes stored in an Atom IndexedDB directory.
+
+    Files are parsed in the calling process by default, or by ``jobs`` worker
+    processes. Workers are started with forkserver or spawn, which import the
+    caller's ``__main__`` module again, so a script passing ``jobs > 1`` must
+    guard its entry point with ``if __name__ == "__main__":``.
+
+    Every file is indexed first, which lists its buffers and grammars without
+    decoding any text. Texts are then read only where the index puts a
+    current version, and each note is yielded as soon as its file is read, so
+    memory use does not grow with the size of the notes. With ``since``,
+    only notes written after that LevelDB sequence number are yielded; pass
+    the highest ``Note.sequence`` of an earlier pass to receive only what
+    changed. Notes without a known grammar get ``default_extension``.
+    ``cache`` lets unchanged files be reused between calls, and notes rejected
+    by ``note_filter`` are skipped.
+
+    Raises FileNotFoundError right away when the directory holds no LevelDB
+    files.
+    """
+    db_dir = expand_path(atom_db_dir)
+    files, in_read_precedence = locate_files(db_dir)
+    if not files:
+        raise FileNotFoundError(f"No LevelDB files found in {db_dir}")
+
+    jobs = jobs if len(files) > 1 else 1
+    return _resolve_notes(
+        _index_files(files, jobs, cache),
+        in_read_precedence,
+        jobs,
+        cache,
+        default_extension,
+        since,
+        note_filter or NoteFilter(),
+    )
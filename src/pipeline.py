@@ -0,0 +1,68 @@
+"""
+Bounded Pipeline Stages
+
+Notes flow through read → extract → resolve → normalize → write as a chain of
+iterators, so nothing waits for the whole database to be read. ``bounded``
+runs the stages in front of it in a background thread, separated from the
+consumer by a queue of fixed size: the producer runs ahead while the consumer
+writes files, and blocks as soon as the queue is full.
+"""
+
+from collections.abc import Generator, Iterable
+import queue
+import threading
+from typing import cast
+
+STAGE_QUEUE_SIZE = 64
+
+_DONE = object()
+
+
+class _StageError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def bounded[T](items: Iterable[T], maxsize: int = STAGE_QUEUE_SIZE) -> Generator[T]:
+    """Produce ``items`` in a background thread, at most ``maxsize`` ahead of the consumer.
+
+    Exceptions raised while producing are re-raised in the consumer. Closing
+    the returned iterator early stops the producer at its next item.
+    """
+    buffer: queue.Queue[object] = queue.Queue(maxsize)
+    stopped = threading.Event()
+
+    def put(item: object) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_StageError(e))
+            return
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+        put(_DONE)
+
+    producer = threading.Thread(target=produce, name="pipeline-stage", daemon=True)
+    producer.start()
+    try:
+        while (item := buffer.get()) is not _DONE:
+            if isinstance(item, _StageError):
+                raise item.error
+            yield cast(T, item)
+    finally:
+        stopped.set()
+        producer.join()
@@ -0,0 +1,86 @@
+"""
+Content-Addressed Snapshot Store
+
+Plain exports rewrite every note into a new timestamped directory, so backups
+grow with every run. The snapshot store keeps each distinct note body once, as
+a blob under ``<out-dir>/.blobs`` named by its SHA-256 digest. A snapshot is the
+usual timestamped directory, but its notes are hardlinks to those blobs, plus a
+``manifest.json`` mapping each file name to its digest.
+
+Blobs are read-only, since every snapshot that contains the same note shares
+the blob's inode. Where hardlinks are not supported, the blob is copied instead.
+A durable store fsyncs every new blob, and ``sync`` persists their directories.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+
+from .writer import fsync_directory, write_file_atomic
+
+BLOB_DIR_NAME = ".blobs"
+MANIFEST_NAME = "manifest.json"
+
+
+class SnapshotStore:
+    """Blob store shared by all snapshots under one output directory."""
+
+    def __init__(self, out_dir: Path, durable: bool = False):
+        self.blob_dir = out_dir / BLOB_DIR_NAME
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.durable = durable
+        self.blobs_written = 0
+        self._unsynced_dirs: set[Path] = set()
+
+    def blob_path(self, digest: str) -> Path:
+        """Return where the blob with ``digest`` is stored."""
+        return self.blob_dir / digest[:2] / digest
+
+    def add(self, content: bytes) -> str:
+        """Store ``content`` unless an identical blob exists, and return its digest."""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.blob_path(digest)
+        if path.exists():
+            return digest
+
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f".{digest}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+            if self.durable:
+                f.flush()
+                os.fsync(f.fileno())
+        tmp_path.chmod(0o444)
+        os.replace(tmp_path, path)
+        self.blobs_written += 1
+        self._unsynced_dirs.add(path.parent)
+        return digest
+
+    def link(self, digest: str, dest: Path) -> None:
+        """Materialize the blob with ``digest`` at ``dest``."""
+        dest.unlink(missing_ok=True)
+        try:
+            os.link(self.blob_path(digest), dest)
+        except OSError:
+            shutil.copyfile(self.blob_path(digest), dest)
+
+    def sync(self) -> None:
+        """Persist the directory entries of the blobs added since the last sync."""
+        for directory in sorted(self._unsynced_dirs):
+            fsync_directory(directory)
+        if self._unsynced_dirs:
+            fsync_directory(self.blob_dir)
+        self._unsynced_dirs.clear()
+
+    def write_manifest(self, snapshot_dir: Path, entries: dict[str, str]) -> Path:
+        """Record which blob each file of a snapshot refers to.
+
+        The manifest is replaced atomically, and fsynced in a durable store;
+        its directory entry is left to the caller's directory sync.
+        """
+        manifest_path = snapshot_dir / MANIFEST_NAME
+        content = json.dumps(entries, indent=2, sort_keys=True).encode("utf-8")
+        write_file_atomic(manifest_path, content, durable=self.durable)
+        return manifest_path
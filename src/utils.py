@@ -1,9 +1,82 @@
+from collections.abc import Iterator
+import functools
+import logging
+import mmap
+import os
 from pathlib import Path
 import re
-
-from rich.console import Console
-
-console = Console()
+from typing import NamedTuple, TypeGuard
+import zlib
+
+from .leveldb import (
+    TABLE_SUFFIXES,
+    TYPE_VALUE,
+    CorruptionError,
+    Record,
+    decode_varint,
+    iter_log_payloads,
+    iter_log_records,
+    iter_table_records,
+    live_files,
+    parse_write_batch,
+)
+from .v8 import STRING_ENCODINGS, V8DecodeError, V8String, iter_indexeddb_objects
+
+logger = logging.getLogger(__name__)
+
+
+KEPT_CONTROL_CHARACTERS = "\n\t\r"
+ASCII_CONTROL_TABLE = dict.fromkeys(
+    code
+    for code in range(0x80)
+    if not chr(code).isprintable() and chr(code) not in KEPT_CONTROL_CHARACTERS
+)
+ASTRAL_RE = re.compile("[\U00010000-\U0010ffff]")
+
+
+@functools.cache
+def _bmp_control_pattern() -> re.Pattern[str]:
+    """Compile a character class of the non-printable characters below U+10000.
+
+    It is derived from ``str.isprintable`` on first use, so it follows the
+    Unicode version of the running Python.
+    """
+    ranges = []
+    start = None
+    for code in range(0x10001):
+        dropped = (
+            code < 0x10000
+            and not chr(code).isprintable()
+            and chr(code) not in KEPT_CONTROL_CHARACTERS
+        )
+        if dropped and start is None:
+            start = code
+        elif not dropped and start is not None:
+            ranges.append(f"{re.escape(chr(start))}-{re.escape(chr(code - 1))}")
+            start = None
+
+    return re.compile(f"[{''.join(ranges)}]+")
+
+
+def _keep_printable(match: re.Match[str]) -> str:
+    return match[0] if match[0].isprintable() else ""
+
+
+def remove_control_characters(text: str) -> str:
+    """Drop every non-printable character except newlines, tabs and carriage returns.
+
+    Same result as testing each character with ``str.isprintable``, without a
+    Python-level loop: ASCII text goes through a translate deletion table and
+    other text through a precompiled character class. Characters beyond the
+    BMP are rare in notes and are checked one by one.
+    """
+    if text.isascii():
+        return text.translate(ASCII_CONTROL_TABLE)
+
+    text = _bmp_control_pattern().sub("", text)
+    if ASTRAL_RE.search(text):
+        text = ASTRAL_RE.sub(_keep_printable, text)
+    return text
 
 
 def normalize_text(blob: bytes) -> str:
@@ -13,8 +86,11 @@ def normalize_text(blob: bytes) -> str:
     except UnicodeDecodeError:
         text = blob.decode("latin-1", errors="replace")
 
-    text = "".join(c if c.isprintable() or c in "\n\t\r" else "" for c in text)
-    return text.strip()
+    return remove_control_characters(text).strip()
+
+
+# is_internal_buffer looks at 200 characters at most, of up to 4 bytes each
+INTERNAL_MARKER_SPAN = 800
 
 
 def is_internal_buffer(text: str) -> bool:
@@ -33,105 +109,461 @@ def is_internal_buffer(text: str) -> bool:
     return any(marker in first_line for marker in internal_markers)
 
 
-def extract_buffer_grammars(data: bytes) -> dict[str, str]:
-    """Extract grammar/syntax mappings for buffers from IndexedDB."""
-    pattern = rb'([a-f0-9]{32})"[\s\x00-\x1f]{1,5}((?:text|source)\.[a-z0-9.\-]+)'
-    matches = re.findall(pattern, data)
+BUFFER_ID_RE = re.compile(r"[a-f0-9]{32}")
+GRAMMAR_RE = re.compile(r"(?:text|source)\.[a-z0-9.\-]+")
+BUFFER_FIELDS = frozenset({"id", "text"})
 
-    grammars = {}
-    for bid, grammar in matches:
-        grammars[bid.decode()] = grammar.decode()
 
-    return grammars
+def _is_buffer_id(key: object) -> TypeGuard[str]:
+    return isinstance(key, str) and BUFFER_ID_RE.fullmatch(key) is not None
 
 
-def decode_varint_length(data: bytes, offset: int) -> tuple[int, int]:
-    """Decode variable-length integer used for string lengths."""
-    if offset >= len(data):
-        return 0, 0
+def clean_buffer_text(text: str) -> bytes:
+    """Drop control characters from decoded note text and re-encode it as UTF-8."""
+    return remove_control_characters(text).strip().encode("utf-8")
 
-    first_byte = data[offset]
 
-    if first_byte < 128:
-        return first_byte, 1
+def decode_varint_length(data: bytes | memoryview, offset: int) -> tuple[int, int]:
+    """Decode variable-length integer used for string lengths.
 
-    if offset + 1 >= len(data):
+    Returns (length, bytes_consumed), or (0, 0) when the varint is truncated.
+    """
+    try:
+        length, end = decode_varint(data, offset)
+    except CorruptionError:
         return 0, 0
 
-    second_byte = data[offset + 1]
-    length = (first_byte & 0x7F) | (second_byte << 7)
-    return length, 2
+    return length, end - offset
 
 
-def extract_buffers_by_id(data: bytes) -> dict[str, bytes]:
-    """Extract all unique buffer IDs and their text content from IndexedDB."""
-    buffer_ids = set(re.findall(rb'id"\s+([a-f0-9]{32})"', data))
-    buffer_texts = {}
+# Buffer records (``id"  <id>"``) and grammar assignments (``<id>" source.x``)
+# share a quote next to the buffer ID. Scanning for that quote finds both in
+# one pass; lookbehinds check the ID side of the quote without slicing data.
+BUFFER_DATA_PATTERN = re.compile(
+    rb'"(?:(?<=id")(?=\s+([a-f0-9]{32})")'
+    rb'|(?<=([a-f0-9]{32})")[\s\x00-\x1f]{1,5}((?:text|source)\.[a-z0-9.\-]+))'
+)
+# V8 writes the ``text`` key as a one-byte string (tag, length 4, name), then
+# the value's string tag: ``"`` for Latin-1, ``c`` for UTF-16LE (after at most
+# one alignment padding byte) or the legacy ``S`` for UTF-8
+TEXT_MARKER_RE = re.compile(rb'text(")|(?<=\x04)text\x00?([cS])')
+SEARCH_WINDOW = 2000
 
-    for bid in buffer_ids:
-        id_pattern = rb'id"\s+' + bid + rb'"'
-        id_match = re.search(id_pattern, data)
 
-        if not id_match:
-            buffer_texts[bid.decode()] = b""
-            continue
+def _find_buffer_text(data: memoryview, start_pos: int) -> V8String | None:
+    """Locate the ``text`` payload that follows a buffer ID record at ``start_pos``.
 
-        start_pos = id_match.start()
-        search_window_end = min(len(data), start_pos + 2000)
-        search_window = data[start_pos:search_window_end]
+    The marker is searched for in place within ``SEARCH_WINDOW`` bytes, and
+    the payload is returned as a view into ``data``, whatever its size, with
+    the codec its V8 string tag names. Nothing is decoded yet.
+    """
+    marker = TEXT_MARKER_RE.search(data, start_pos, start_pos + SEARCH_WINDOW)
+    if marker is None:
+        return None
+    encoding = STRING_ENCODINGS[(marker[1] or marker[2])[0]]
 
-        text_marker = rb'text"'
-        text_pos = search_window.find(text_marker)
+    length_offset = marker.end()
+    if length_offset >= len(data):
+        return None
 
-        if text_pos == -1:
-            buffer_texts[bid.decode()] = b""
-            continue
+    text_length, bytes_consumed = decode_varint_length(data, length_offset)
+    if text_length == 0:
+        return None
 
-        length_offset = text_pos + len(text_marker)
+    content_start = length_offset + bytes_consumed
+    content_end = content_start + text_length
+    if content_end > len(data):
+        return None
 
-        if length_offset >= len(search_window):
-            buffer_texts[bid.decode()] = b""
-            continue
+    return V8String(data[content_start:content_end], encoding)
 
-        text_length, bytes_consumed = decode_varint_length(search_window, length_offset)
 
-        if text_length == 0 or text_length > 10000:
-            buffer_texts[bid.decode()] = b""
-            continue
+def _decode_buffer_text(text: V8String | None, buffer_id: str) -> bytes:
+    """Decode a stored buffer text into cleaned UTF-8; missing texts are empty."""
+    if text is None:
+        return b""
+    try:
+        return clean_buffer_text(text.decode())
+    except Exception as e:
+        logger.warning("Error decoding buffer text: %s (%s)", e, buffer_id)
+        return b""
 
-        content_start = length_offset + bytes_consumed
-        content_end = content_start + text_length
 
-        if content_end > len(search_window):
-            buffer_texts[bid.decode()] = b""
-            continue
+def _stored_size(text: V8String | None) -> int:
+    return len(text.payload) if text is not None else 0
+
+
+def _is_internal_text(text: V8String | None) -> bool:
+    """Check whether a stored text is Atom's internal state, decoding only its head."""
+    if text is None:
+        return False
+    head = V8String(text.payload[:INTERNAL_MARKER_SPAN], text.encoding).decode()
+    return is_internal_buffer(remove_control_characters(head).strip())
+
+
+class BufferExtraction(NamedTuple):
+    """Buffer texts and grammar overrides found in one IndexedDB value."""
+
+    texts: dict[str, bytes]
+    grammars: dict[str, str]
+
+
+class _StoredBuffers(NamedTuple):
+    texts: dict[str, V8String | None]
+    grammars: dict[str, str]
+
+
+def _is_buffer_field(key: object) -> bool:
+    return key in BUFFER_FIELDS or _is_buffer_id(key)
+
+
+def _is_text_field(key: object) -> bool:
+    return key == "text"
 
-        text_bytes = search_window[content_start:content_end]
 
-        try:
-            text = text_bytes.decode("utf-8", errors="ignore")
-            clean = "".join(c if c.isprintable() or c in "\n\t\r" else "" for c in text)
-            clean = clean.strip()
+def _find_v8_buffer_data(data: bytes | memoryview) -> _StoredBuffers:
+    """Find buffer texts and grammar overrides in a V8 serialized IndexedDB value.
 
-            buffer_texts[bid.decode()] = clean.encode("utf-8")
-        except Exception as e:
-            console.print(f"[yellow]⚠ Error decoding buffer text: {e} ({bid.decode()})[/yellow]")
-            buffer_texts[bid.decode()] = b""
+    Buffers (objects with ``id`` and ``text``) and grammar maps (objects keyed
+    by buffer ID) are collected in the same walk over the value. Texts are
+    left undecoded.
+    """
+    texts: dict[str, V8String | None] = {}
+    grammars: dict[str, str] = {}
+    for props in iter_indexeddb_objects(data, _is_buffer_field, _is_text_field):
+        buffer_id = props.get("id")
+        text = props.get("text")
+        if isinstance(text, str):
+            # String objects wrap their value, which the walk decodes
+            text = V8String(memoryview(text.encode("utf-8")), "utf-8")
+        if _is_buffer_id(buffer_id) and isinstance(text, V8String):
+            texts.setdefault(buffer_id, text)
 
-    return buffer_texts
+        for key, value in props.items():
+            if _is_buffer_id(key) and isinstance(value, str) and GRAMMAR_RE.fullmatch(value):
+                grammars[key] = value
+    return _StoredBuffers(texts, grammars)
+
+
+def _find_buffer_data(data: bytes | memoryview) -> _StoredBuffers:
+    """Find buffer texts and grammar overrides in a single pass, without decoding texts.
+
+    V8 serialized values are walked field by field. Anything else is scanned
+    once from start to end with one pattern matching both buffer records and
+    grammar assignments; the first record seen for a buffer ID provides its
+    text and the last assignment seen provides its grammar.
+    """
+    try:
+        return _find_v8_buffer_data(data)
+    except V8DecodeError:
+        pass
+
+    view = memoryview(data)
+    texts: dict[str, V8String | None] = {}
+    grammars: dict[str, str] = {}
+
+    for match in BUFFER_DATA_PATTERN.finditer(view):
+        buffer_id, grammar_id, grammar = match.groups()
+        if buffer_id is not None:
+            bid = str(buffer_id, "ascii")
+            if bid not in texts:
+                texts[bid] = _find_buffer_text(view, match.start() - 2)
+        else:
+            grammars[str(grammar_id, "ascii")] = str(grammar, "ascii")
+
+    return _StoredBuffers(texts, grammars)
+
+
+def extract_buffer_data(data: bytes | memoryview) -> BufferExtraction:
+    """Extract buffer texts and grammar overrides from IndexedDB in a single pass.
+
+    Each text is decoded straight from ``data`` with the codec its V8 string
+    tag names; only the cleaned note text is materialized.
+    """
+    texts, grammars = _find_buffer_data(data)
+    return BufferExtraction(
+        {bid: _decode_buffer_text(text, bid) for bid, text in texts.items()}, grammars
+    )
+
+
+def extract_buffer_grammars(data: bytes | memoryview) -> dict[str, str]:
+    """Extract grammar/syntax mappings for buffers from IndexedDB."""
+    return extract_buffer_data(data).grammars
+
+
+def extract_buffers_by_id(data: bytes | memoryview) -> dict[str, bytes]:
+    """Extract all unique buffer IDs and their text content from IndexedDB."""
+    return extract_buffer_data(data).texts
 
 
 def collect_files(atom_db_dir: Path) -> list[Path]:
-    """Collect all LevelDB files from IndexedDB directory."""
+    """Collect the LevelDB files to read from IndexedDB directory.
+
+    With a ``CURRENT``/``MANIFEST`` pair only live files are returned, in LevelDB
+    read precedence (logs, then tables from level 0 down). Otherwise every
+    ``*.ldb`` and ``*.log`` file is returned in the same precedence, judged by
+    file number (logs first, then tables, higher numbers first); files without
+    a numeric name follow, most recently modified first.
+    """
+    return locate_files(atom_db_dir)[0]
+
+
+def locate_files(atom_db_dir: Path) -> tuple[list[Path], bool]:
+    """Collect the LevelDB files like ``collect_files``, and tell how they were ordered.
+
+    The flag is True when the order comes from the MANIFEST, and so is the
+    real read precedence. Without one, the order by file number is only a
+    guess, and a key's newest write may sit in a file that comes later.
+    """
     if not atom_db_dir.exists():
-        return []
+        return [], False
+
+    try:
+        live = live_files(atom_db_dir)
+    except (CorruptionError, OSError) as e:
+        logger.info("Ignoring unreadable MANIFEST, reading all files: %s", e)
+        live = None
+
+    if live is not None:
+        return [live_file.path for live_file in live], True
 
     candidates: list[Path] = []
     for pat in ["*.ldb", "*.log"]:
         candidates.extend(atom_db_dir.glob(pat))
 
-    candidates.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-    return candidates
+    candidates.sort(key=_fallback_precedence)
+    return candidates, False
+
+
+def _fallback_precedence(path: Path) -> tuple[bool, bool, int, float]:
+    number = int(path.stem) if path.stem.isdigit() else 0
+    return path.suffix != ".log", not path.stem.isdigit(), -number, -path.stat().st_mtime
+
+
+RAW_KEY_PREFIX = b"\x00raw:"
+
+
+def map_file(path: Path) -> memoryview:
+    """Memory-map a file read-only, hinting the kernel that it is read sequentially.
+
+    The mapping stays valid after the file is closed and is released once the
+    last view of it is gone, so memory use is bounded by the page cache rather
+    than by copies on the Python heap.
+    """
+    with path.open("rb") as stream:
+        if os.fstat(stream.fileno()).st_size == 0:
+            return memoryview(b"")
+        mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+        mapped.madvise(mmap.MADV_SEQUENTIAL)
+
+    return memoryview(mapped)
+
+
+def _iter_leveldb_records(path: Path, data: memoryview) -> Iterator[Record]:
+    """Pick the LevelDB reader matching the file type."""
+    if path.suffix in TABLE_SUFFIXES:
+        return iter_table_records(data)
+    return iter_log_records(data)
+
+
+def iter_file_records(path: Path) -> Iterator[Record]:
+    """Yield the records stored in a LevelDB file.
+
+    The file is memory-mapped and parsed in place. Log files are decoded into
+    whole records, so values that span block boundaries come through intact,
+    and table blocks are decompressed before they are scanned. A file that
+    cannot be parsed as LevelDB data is yielded as a single record holding the
+    mapped file contents, with sequence number 0 and a key unique to the file.
+    """
+    data = map_file(path)
+
+    record_count = 0
+    try:
+        for record in _iter_leveldb_records(path, data):
+            record_count += 1
+            yield record
+    except CorruptionError as e:
+        if record_count:
+            logger.info("Stopped reading %s at corrupt record: %s", path.name, e)
+
+    if not record_count:
+        yield Record(RAW_KEY_PREFIX + path.name.encode(), data, 0, TYPE_VALUE)
+
+
+class ExtractedRecord(NamedTuple):
+    """Buffers and grammars found in one LevelDB record, without the record value.
+
+    ``sizes`` holds the stored size of every buffer text in bytes, as it was
+    before decoding and cleaning.
+    """
+
+    key: bytes
+    sequence: int
+    value_type: int
+    buffers: dict[str, bytes]
+    grammars: dict[str, str]
+    sizes: dict[str, int]
+
+
+class IndexedRecord(NamedTuple):
+    """Which buffers and grammars one LevelDB record holds, without the buffer texts.
+
+    ``buffers`` maps each buffer ID to the stored size of its text in bytes.
+    """
+
+    key: bytes
+    sequence: int
+    value_type: int
+    buffers: dict[str, int]
+    grammars: dict[str, str]
+
+
+CURSOR_CHECKSUM_SPAN = 4096
+
+
+class LogCursor(NamedTuple):
+    """Resume point in a write-ahead log file.
+
+    Every record before ``offset`` has been processed. ``checksum`` is the CRC32
+    of the bytes just before ``offset`` and detects a file that was rewritten
+    rather than appended to.
+    """
+
+    number: int
+    offset: int
+    checksum: int
+
+
+class FileExtraction(NamedTuple):
+    """Results of extracting one file, possibly resumed from a log cursor."""
+
+    records: list[ExtractedRecord]
+    cursor: LogCursor | None
+    resumed: bool
+
+
+def _cursor_checksum(data: memoryview, offset: int) -> int:
+    return zlib.crc32(data[max(0, offset - CURSOR_CHECKSUM_SPAN) : offset])
+
+
+def _extract_record(record: Record) -> ExtractedRecord:
+    """Extract buffers and grammars from a record and drop its value."""
+    if record.value_type != TYPE_VALUE:
+        return ExtractedRecord(record.key, record.sequence, record.value_type, {}, {}, {})
+
+    texts, grammars = _find_buffer_data(record.value)
+    return ExtractedRecord(
+        record.key,
+        record.sequence,
+        record.value_type,
+        {bid: _decode_buffer_text(text, bid) for bid, text in texts.items()},
+        grammars,
+        {bid: _stored_size(text) for bid, text in texts.items()},
+    )
+
+
+def _extract_log_records(path: Path, resume: LogCursor | None) -> FileExtraction | None:
+    """Extract a write-ahead log, starting at ``resume`` if it still matches the file.
+
+    Returns None when the file does not parse as a log at all.
+    """
+    data = map_file(path)
+    number = int(path.stem) if path.stem.isdigit() else 0
+
+    start = 0
+    if (
+        resume is not None
+        and resume.number == number
+        and resume.offset <= len(data)
+        and _cursor_checksum(data, resume.offset) == resume.checksum
+    ):
+        start = resume.offset
+
+    records: list[ExtractedRecord] = []
+    offset = start
+    try:
+        for end_offset, payload in iter_log_payloads(data, start):
+            offset = end_offset
+            records.extend(_extract_record(record) for record in parse_write_batch(payload))
+    except CorruptionError as e:
+        if start == 0 and not records:
+            return None
+        logger.info("Stopped reading %s at corrupt record: %s", path.name, e)
+
+    if start == 0 and not records:
+        return None
+
+    cursor = LogCursor(number, offset, _cursor_checksum(data, offset))
+    return FileExtraction(records, cursor, start > 0)
+
+
+def extract_file_records(path: Path, resume: LogCursor | None = None) -> FileExtraction:
+    """Read a LevelDB file and extract the buffers and grammars of every record.
+
+    Only the extracted results are returned, so they are cheap to send back
+    from a worker process. For write-ahead logs the result carries a cursor
+    after the last complete record; passing it back as ``resume`` on a later
+    call extracts only the records appended since, unless the file was
+    truncated or rewritten, in which case it is read from the start again.
+    """
+    if path.suffix == ".log":
+        extraction = _extract_log_records(path, resume)
+        if extraction is not None:
+            return extraction
+
+    records = [_extract_record(record) for record in iter_file_records(path)]
+    return FileExtraction(records, None, False)
+
+
+def _index_record(record: Record) -> IndexedRecord:
+    """List the buffers and grammars of a record without decoding buffer texts."""
+    if record.value_type == TYPE_VALUE:
+        texts, grammars = _find_buffer_data(record.value)
+    else:
+        texts, grammars = {}, {}
+    sizes = {bid: _stored_size(text) for bid, text in texts.items()}
+    return IndexedRecord(record.key, record.sequence, record.value_type, sizes, grammars)
+
+
+def index_file_records(path: Path) -> list[IndexedRecord]:
+    """Read a LevelDB file and list the buffers and grammars of every record.
+
+    Buffer texts are located but never decoded, so the index of a file is
+    small and cheap to send back from a worker process. ``read_file_texts``
+    decodes the texts that turn out to be wanted.
+    """
+    return [_index_record(record) for record in iter_file_records(path)]
+
+
+def read_file_texts(
+    path: Path, wanted: dict[tuple[bytes, int], list[str]]
+) -> dict[str, bytes | None]:
+    """Decode the texts of the ``wanted`` buffers of a LevelDB file.
+
+    ``wanted`` maps records, by key and sequence number, to the buffer IDs to
+    read from them. Other buffers are not decoded, and the file is read only
+    as far as the last wanted record. Buffers holding Atom's internal state
+    are recognized from the head of their text and returned as None.
+    """
+    remaining = dict(wanted)
+    texts: dict[str, bytes | None] = {}
+    for record in iter_file_records(path):
+        buffer_ids = remaining.pop((record.key, record.sequence), None)
+        if buffer_ids is None:
+            continue
+
+        if record.value_type == TYPE_VALUE:
+            stored = _find_buffer_data(record.value).texts
+            for bid in buffer_ids:
+                if bid not in stored:
+                    continue
+                text = stored[bid]
+                texts[bid] = None if _is_internal_text(text) else _decode_buffer_text(text, bid)
+        if not remaining:
+            break
+    return texts
 
 
 def expand_path(value: str | Path) -> Path:
@@ -139,6 +571,11 @@ def expand_path(value: str | Path) -> Path:
     return Path(value).expanduser().resolve()
 
 
+def expand_optional_path(value: str | Path | None) -> Path | None:
+    """Expand an optional path, keeping None as is."""
+    return None if value is None else expand_path(value)
+
+
 def validate_and_expand_atom_db_dir(value: str | Path) -> Path:
     """Validate and expand atom_db_dir path."""
     path = expand_path(value)
@@ -150,3 +587,19 @@ def validate_and_expand_atom_db_dir(value: str | Path) -> Path:
         raise ValueError(f"Atom database path is not a directory: {path}")
 
     return path
+
+
+def default_jobs() -> int:
+    """Default number of worker processes: one per CPU."""
+    return os.cpu_count() or 1
+
+
+def validate_jobs(value: int | None) -> int:
+    """Validate the worker process count, defaulting to one per CPU."""
+    if value is None:
+        return default_jobs()
+
+    if value < 1:
+        raise ValueError(f"Number of jobs must be at least 1, got {value}")
+
+    return value
@@ -0,0 +1,340 @@
+"""
+V8 Structured-Clone Decoder
+
+Chromium stores IndexedDB values in V8's serialization format: version headers
+followed by a single tagged value. Objects and arrays are written as a begin
+tag, their contents and an end tag carrying a count; strings are a tag, a varint
+byte length and the raw Latin-1, UTF-16LE or UTF-8 payload.
+
+The decoder walks that stream in place. Callers choose the object properties
+they need, and everything else is skipped by advancing the read position
+without building Python objects for it.
+"""
+
+from collections.abc import Callable, Iterator
+import struct
+from typing import Any, NamedTuple
+
+TAG_VERSION = 0xFF
+TAG_TRAILER_OFFSET = 0xFE
+TAG_PADDING = 0x00
+TAG_VERIFY_OBJECT_COUNT = ord("?")
+TAG_THE_HOLE = ord("-")
+TAG_UNDEFINED = ord("_")
+TAG_NULL = ord("0")
+TAG_TRUE = ord("T")
+TAG_FALSE = ord("F")
+TAG_INT32 = ord("I")
+TAG_UINT32 = ord("U")
+TAG_DOUBLE = ord("N")
+TAG_BIGINT = ord("Z")
+TAG_UTF8_STRING = ord("S")
+TAG_ONE_BYTE_STRING = ord('"')
+TAG_TWO_BYTE_STRING = ord("c")
+TAG_OBJECT_REFERENCE = ord("^")
+TAG_BEGIN_OBJECT = ord("o")
+TAG_END_OBJECT = ord("{")
+TAG_BEGIN_SPARSE_ARRAY = ord("a")
+TAG_END_SPARSE_ARRAY = ord("@")
+TAG_BEGIN_DENSE_ARRAY = ord("A")
+TAG_END_DENSE_ARRAY = ord("$")
+TAG_DATE = ord("D")
+TAG_TRUE_OBJECT = ord("y")
+TAG_FALSE_OBJECT = ord("x")
+TAG_NUMBER_OBJECT = ord("n")
+TAG_BIGINT_OBJECT = ord("z")
+TAG_STRING_OBJECT = ord("s")
+TAG_REGEXP = ord("R")
+TAG_BEGIN_MAP = ord(";")
+TAG_END_MAP = ord(":")
+TAG_BEGIN_SET = ord("'")
+TAG_END_SET = ord(",")
+TAG_ARRAY_BUFFER = ord("B")
+TAG_ARRAY_BUFFER_VIEW = ord("V")
+
+TRAILER_OFFSET_SIZE = 12
+ARRAY_BUFFER_VIEW_FLAGS_VERSION = 14
+
+STRING_TAGS = frozenset({TAG_ONE_BYTE_STRING, TAG_TWO_BYTE_STRING, TAG_UTF8_STRING})
+CONTAINER_TAGS = frozenset(
+    {TAG_BEGIN_OBJECT, TAG_BEGIN_DENSE_ARRAY, TAG_BEGIN_SPARSE_ARRAY, TAG_BEGIN_MAP, TAG_BEGIN_SET}
+)
+
+STRING_ENCODINGS = {
+    TAG_ONE_BYTE_STRING: "latin-1",
+    TAG_TWO_BYTE_STRING: "utf-16-le",
+    TAG_UTF8_STRING: "utf-8",
+}
+
+
+class V8DecodeError(ValueError):
+    """Raised when data is not a V8 serialized value this decoder understands."""
+
+
+class V8String(NamedTuple):
+    """A string value that was read but not decoded: its payload and codec."""
+
+    payload: memoryview
+    encoding: str
+
+    def decode(self) -> str:
+        """Decode the payload, replacing anything the codec cannot read."""
+        return str(self.payload, self.encoding, "replace")
+
+
+def _never(key: Any) -> bool:
+    return False
+
+
+class V8Reader:
+    """Cursor over a V8 serialized value."""
+
+    def __init__(self, data: bytes | memoryview, pos: int = 0):
+        self.data = memoryview(data)
+        self.pos = pos
+        self.version = 0
+
+    def read_varint(self) -> int:
+        """Read an unsigned base-128 varint of any width."""
+        data = self.data
+        result = 0
+        shift = 0
+        while True:
+            if self.pos >= len(data):
+                raise V8DecodeError("Truncated varint")
+            byte = data[self.pos]
+            self.pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def _read_bytes(self, length: int) -> memoryview:
+        end = self.pos + length
+        if end > len(self.data):
+            raise V8DecodeError("Value runs past the end of the data")
+        chunk = self.data[self.pos : end]
+        self.pos = end
+        return chunk
+
+    def read_header(self) -> None:
+        """Consume the Blink and V8 version headers in front of the value."""
+        data = self.data
+        if self.pos >= len(data) or data[self.pos] != TAG_VERSION:
+            raise V8DecodeError("Missing version header")
+
+        while self.pos < len(data) and data[self.pos] in (TAG_VERSION, TAG_TRAILER_OFFSET):
+            tag = data[self.pos]
+            self.pos += 1
+            if tag == TAG_VERSION:
+                self.version = self.read_varint()
+            else:
+                self._read_bytes(TRAILER_OFFSET_SIZE)
+
+    def read_tag(self) -> int:
+        """Read the next tag, skipping alignment padding and object-count hints."""
+        data = self.data
+        while True:
+            if self.pos >= len(data):
+                raise V8DecodeError("Unexpected end of data")
+            tag = data[self.pos]
+            self.pos += 1
+            if tag == TAG_PADDING:
+                continue
+            if tag == TAG_VERIFY_OBJECT_COUNT:
+                self.read_varint()
+                continue
+            return tag
+
+    def read_string_payload(self) -> memoryview:
+        """Read the raw bytes of a string whose tag has been consumed."""
+        return self._read_bytes(self.read_varint())
+
+    def read_primitive(self, tag: int) -> Any:
+        """Read a non-container value whose tag has been consumed."""
+        if tag in STRING_TAGS:
+            return str(self.read_string_payload(), STRING_ENCODINGS[tag], "replace")
+        if tag in (TAG_NULL, TAG_UNDEFINED, TAG_THE_HOLE):
+            return None
+        if tag in (TAG_TRUE, TAG_TRUE_OBJECT):
+            return True
+        if tag in (TAG_FALSE, TAG_FALSE_OBJECT):
+            return False
+        if tag == TAG_INT32:
+            value = self.read_varint()
+            return (value >> 1) ^ -(value & 1)
+        if tag in (TAG_UINT32, TAG_OBJECT_REFERENCE):
+            value = self.read_varint()
+            return value if tag == TAG_UINT32 else None
+        if tag in (TAG_DOUBLE, TAG_DATE, TAG_NUMBER_OBJECT):
+            (number,) = struct.unpack("<d", self._read_bytes(8))
+            return number
+        if tag in (TAG_BIGINT, TAG_BIGINT_OBJECT):
+            bitfield = self.read_varint()
+            magnitude = int.from_bytes(self._read_bytes(bitfield >> 1), "little")
+            return -magnitude if bitfield & 1 else magnitude
+        if tag == TAG_STRING_OBJECT:
+            return self.read_primitive(self.read_tag())
+        if tag == TAG_REGEXP:
+            pattern = self.read_primitive(self.read_tag())
+            self.read_varint()
+            return pattern
+        if tag == TAG_ARRAY_BUFFER:
+            return bytes(self.read_string_payload())
+        if tag == TAG_ARRAY_BUFFER_VIEW:
+            self._read_bytes(1)
+            self.read_varint()
+            self.read_varint()
+            if self.version >= ARRAY_BUFFER_VIEW_FLAGS_VERSION:
+                self.read_varint()
+            return None
+
+        raise V8DecodeError(f"Unsupported tag 0x{tag:02x} at offset {self.pos - 1}")
+
+    def skip_primitive(self, tag: int) -> None:
+        """Advance past a non-container value without decoding it."""
+        if tag in STRING_TAGS:
+            self._read_bytes(self.read_varint())
+        else:
+            self.read_primitive(tag)
+
+    def skip_value(self, tag: int) -> None:
+        """Advance past any value, containers included, whose tag has been consumed."""
+        if tag in CONTAINER_TAGS:
+            for _ in self.walk(tag, _never):
+                pass
+        else:
+            self.skip_primitive(tag)
+
+    def read_value(self, tag: int) -> Any:
+        """Materialize a complete value whose tag has been consumed."""
+        if tag == TAG_BEGIN_OBJECT:
+            obj: dict[Any, Any] = {}
+            while (key_tag := self.read_tag()) != TAG_END_OBJECT:
+                key = self.read_primitive(key_tag)
+                obj[key] = self.read_value(self.read_tag())
+            self.read_varint()
+            return obj
+
+        if tag == TAG_BEGIN_DENSE_ARRAY:
+            items = [self.read_value(self.read_tag()) for _ in range(self.read_varint())]
+            while (key_tag := self.read_tag()) != TAG_END_DENSE_ARRAY:
+                self.read_primitive(key_tag)
+                self.read_value(self.read_tag())
+            self.read_varint()
+            self.read_varint()
+            return items
+
+        if tag == TAG_BEGIN_SPARSE_ARRAY:
+            sparse = [None] * self.read_varint()
+            while (key_tag := self.read_tag()) != TAG_END_SPARSE_ARRAY:
+                index = self.read_primitive(key_tag)
+                value = self.read_value(self.read_tag())
+                if isinstance(index, int) and 0 <= index < len(sparse):
+                    sparse[index] = value
+            self.read_varint()
+            self.read_varint()
+            return sparse
+
+        if tag in (TAG_BEGIN_MAP, TAG_BEGIN_SET):
+            end_tag = TAG_END_MAP if tag == TAG_BEGIN_MAP else TAG_END_SET
+            entries = []
+            while (item_tag := self.read_tag()) != end_tag:
+                entries.append(self.read_value(item_tag))
+            self.read_varint()
+            if tag == TAG_BEGIN_MAP:
+                return dict(zip(entries[::2], entries[1::2], strict=True))
+            return entries
+
+        return self.read_primitive(tag)
+
+    def walk(
+        self, tag: int, want: Callable[[Any], bool], raw: Callable[[Any], bool] = _never
+    ) -> Iterator[dict[Any, Any]]:
+        """Walk a value whose tag has been consumed and yield wanted object properties.
+
+        For every object reached, the primitive properties whose key satisfies
+        ``want`` are decoded and yielded together as one dict once the object
+        ends; objects without wanted properties yield nothing. Wanted strings
+        whose key also satisfies ``raw`` are yielded as V8String, undecoded.
+        Containers are always descended into, and unwanted primitives are
+        skipped undecoded. Nested objects are yielded before the objects that
+        contain them.
+        """
+        if tag == TAG_BEGIN_OBJECT:
+            props: dict[Any, Any] = {}
+            while (key_tag := self.read_tag()) != TAG_END_OBJECT:
+                key = self.read_primitive(key_tag)
+                value_tag = self.read_tag()
+                if value_tag in CONTAINER_TAGS:
+                    yield from self.walk(value_tag, want, raw)
+                elif want(key):
+                    if value_tag in STRING_TAGS and raw(key):
+                        props[key] = V8String(
+                            self.read_string_payload(), STRING_ENCODINGS[value_tag]
+                        )
+                    else:
+                        props[key] = self.read_primitive(value_tag)
+                else:
+                    self.skip_primitive(value_tag)
+            self.read_varint()
+            if props:
+                yield props
+
+        elif tag in (TAG_BEGIN_DENSE_ARRAY, TAG_BEGIN_SPARSE_ARRAY):
+            end_tag = TAG_END_DENSE_ARRAY if tag == TAG_BEGIN_DENSE_ARRAY else TAG_END_SPARSE_ARRAY
+            length = self.read_varint()
+            if tag == TAG_BEGIN_DENSE_ARRAY:
+                for _ in range(length):
+                    yield from self._walk_item(self.read_tag(), want, raw)
+            while (key_tag := self.read_tag()) != end_tag:
+                self.skip_primitive(key_tag)
+                yield from self._walk_item(self.read_tag(), want, raw)
+            self.read_varint()
+            self.read_varint()
+
+        elif tag in (TAG_BEGIN_MAP, TAG_BEGIN_SET):
+            end_tag = TAG_END_MAP if tag == TAG_BEGIN_MAP else TAG_END_SET
+            while (item_tag := self.read_tag()) != end_tag:
+                yield from self._walk_item(item_tag, want, raw)
+            self.read_varint()
+
+        else:
+            self.skip_primitive(tag)
+
+    def _walk_item(
+        self, tag: int, want: Callable[[Any], bool], raw: Callable[[Any], bool]
+    ) -> Iterator[dict[Any, Any]]:
+        if tag in CONTAINER_TAGS:
+            yield from self.walk(tag, want, raw)
+        else:
+            self.skip_primitive(tag)
+
+
+def open_indexeddb_value(data: bytes | memoryview) -> V8Reader:
+    """Position a reader on the value stored in an IndexedDB object store record.
+
+    Chromium prefixes the serialized value with a varint record version.
+    """
+    reader = V8Reader(data)
+    if reader.data[:1] != b"\xff":
+        reader.read_varint()
+    reader.read_header()
+    return reader
+
+
+def iter_indexeddb_objects(
+    data: bytes | memoryview, want: Callable[[Any], bool], raw: Callable[[Any], bool] = _never
+) -> Iterator[dict[Any, Any]]:
+    """Yield the wanted properties of every object in an IndexedDB record value.
+
+    Strings whose key satisfies ``raw`` are left undecoded, see ``V8Reader.walk``.
+    """
+    reader = open_indexeddb_value(data)
+    yield from reader.walk(reader.read_tag(), want, raw)
+
+
+def decode_indexeddb_value(data: bytes | memoryview) -> Any:
+    """Materialize the complete value of an IndexedDB record."""
+    reader = open_indexeddb_value(data)
+    return reader.read_value(reader.read_tag())
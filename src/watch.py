@@ -0,0 +1,136 @@
+"""
+Directory Change Watchers
+
+Watch mode keeps the process alive and re-exports notes when the LevelDB
+directory changes. On Linux the directory is watched through inotify (via
+ctypes, no extra dependency); elsewhere, or when inotify is unavailable, the
+directory listing is polled for changed names, sizes and modification times.
+"""
+
+import ctypes
+import ctypes.util
+import os
+from pathlib import Path
+import select
+import sys
+import time
+from typing import Protocol
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+POLL_INTERVAL = 1.0
+
+
+class Watcher(Protocol):
+    """Source of change notifications for a directory."""
+
+    name: str
+
+    def wait(self, timeout: float | None) -> bool:
+        """Block until something changed or ``timeout`` elapsed; True on change."""
+        ...
+
+    def close(self) -> None:
+        """Release the resources held by the watcher."""
+        ...
+
+
+class InotifyWatcher:
+    """Linux inotify watch on a single directory."""
+
+    name = "inotify"
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float | None) -> bool:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+
+        # Drain every queued event; only the fact that something changed matters
+        try:
+            while os.read(self._fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Fallback watcher comparing directory snapshots at a fixed interval."""
+
+    name = "polling"
+
+    def __init__(self, directory: Path, interval: float = POLL_INTERVAL):
+        self._directory = directory
+        self._interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        for path in self._directory.iterdir():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout: float | None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+
+            time.sleep(self._interval if remaining is None else min(self._interval, remaining))
+
+            snapshot = self._take_snapshot()
+            if snapshot != self._snapshot:
+                self._snapshot = snapshot
+                return True
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(directory: Path) -> Watcher:
+    """Watch ``directory`` with inotify when possible, falling back to polling."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(directory)
+
+
+def wait_for_change(watcher: Watcher, debounce: float) -> None:
+    """Block until the directory changes and then stays quiet for ``debounce`` seconds.
+
+    LevelDB writes, log rotations and compactions arrive as bursts of events;
+    waiting for the burst to settle turns them into a single re-export.
+    """
+    watcher.wait(None)
+    while watcher.wait(debounce):
+        pass
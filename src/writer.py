@@ -0,0 +1,140 @@
+"""
+Atomic Note Writer
+
+Notes are written by a small thread pool, so file system latency overlaps
+instead of adding up. Every note goes to a temporary file next to its final
+name and is moved into place with ``os.replace``, so a crash leaves either the
+complete note or no file at all, never a torn one.
+
+In durable mode each file is also fsynced before it is moved into place, and
+the directory is fsynced once per batch of files rather than once per file,
+which makes the renames themselves survive a power loss.
+"""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+from pathlib import Path
+from types import TracebackType
+
+WRITE_THREADS = 8
+WRITE_BATCH_SIZE = 64
+
+
+class NoteWriteError(Exception):
+    """A note could not be written."""
+
+    def __init__(self, filename: str, error: OSError):
+        super().__init__(f"{filename}: {error}")
+        self.filename = filename
+        self.error = error
+
+
+def fsync_directory(directory: Path) -> None:
+    """Persist the entries of ``directory``, where the platform supports it."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # Directories cannot be opened on Windows, where NTFS journals renames itself
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_file_atomic(path: Path, content: bytes, durable: bool = False) -> None:
+    """Write ``content`` to a temporary file and move it into place."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class NoteWriter:
+    """Writes files into one directory through a thread pool.
+
+    At most ``threads * 2`` writes are pending at a time, so the producer of
+    the notes is held back instead of queueing them all in memory. Errors are
+    raised as NoteWriteError from ``write`` or ``close``.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        durable: bool = False,
+        threads: int = WRITE_THREADS,
+        batch_size: int = WRITE_BATCH_SIZE,
+    ):
+        self.directory = directory
+        self.durable = durable
+        self.batch_size = batch_size
+        self.files_written = 0
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="note-writer")
+        self._limit = threads * 2
+        self._pending: deque[tuple[str, Future[None]]] = deque()
+        self._unsynced = 0
+
+    def write(self, filename: str, content: bytes) -> None:
+        """Queue ``content`` to be written as ``filename``."""
+        while len(self._pending) >= self._limit:
+            self._finish_oldest()
+        future = self._executor.submit(
+            write_file_atomic, self.directory / filename, content, self.durable
+        )
+        self._pending.append((filename, future))
+
+    def close(self) -> None:
+        """Wait for all queued writes and sync the directory."""
+        try:
+            while self._pending:
+                self._finish_oldest()
+            if self.durable:
+                self._sync()
+                try:
+                    fsync_directory(self.directory.parent)
+                except OSError as e:
+                    raise NoteWriteError(self.directory.name, e) from e
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> "NoteWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._executor.shutdown(cancel_futures=True)
+
+    def _finish_oldest(self) -> None:
+        filename, future = self._pending.popleft()
+        try:
+            future.result()
+        except OSError as e:
+            raise NoteWriteError(filename, e) from e
+
+        self.files_written += 1
+        self._unsynced += 1
+        if self.durable and self._unsynced >= self.batch_size:
+            self._sync()
+
+    def _sync(self) -> None:
+        if self._unsynced:
+            try:
+                fsync_directory(self.directory)
+            except OSError as e:
+                raise NoteWriteError(self.directory.name, e) from e
+            self._unsynced = 0
@@ -0,0 +1,145 @@
+"""Builders for small LevelDB files used as test fixtures."""
+
+from collections.abc import Sequence
+import struct
+
+from src.leveldb.format import TYPE_DELETION, TYPE_VALUE, crc32c, mask_crc
+from src.leveldb.log import BLOCK_SIZE, FIRST_TYPE, FULL_TYPE, HEADER_SIZE, LAST_TYPE, MIDDLE_TYPE
+
+
+def encode_varint(value: int) -> bytes:
+    """Encode an integer as a LevelDB varint."""
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def build_buffer_state(buffer_id: str, text: str) -> bytes:
+    """Encode a buffer the way the byte scanner finds it in an IndexedDB value."""
+    return f'id"  {buffer_id}"text"'.encode() + bytes([len(text)]) + text.encode()
+
+
+def build_write_batch(sequence: int, entries: list[tuple[bytes, bytes | None]]) -> bytes:
+    """Build a write batch; a ``None`` value encodes a deletion."""
+    out = bytearray(struct.pack("<QI", sequence, len(entries)))
+    for key, value in entries:
+        if value is None:
+            out.append(TYPE_DELETION)
+            out += encode_varint(len(key)) + key
+        else:
+            out.append(TYPE_VALUE)
+            out += encode_varint(len(key)) + key + encode_varint(len(value)) + value
+    return bytes(out)
+
+
+def build_log(payloads: list[bytes]) -> bytes:
+    """Write payloads as a LevelDB log, fragmenting them across 32 KiB blocks."""
+    out = bytearray()
+    for payload in payloads:
+        remaining = payload
+        first = True
+        while True:
+            leftover = BLOCK_SIZE - len(out) % BLOCK_SIZE
+            if leftover < HEADER_SIZE:
+                out += b"\x00" * leftover
+                leftover = BLOCK_SIZE
+            available = leftover - HEADER_SIZE
+            fragment, remaining = remaining[:available], remaining[available:]
+            last = not remaining
+            if first and last:
+                record_type = FULL_TYPE
+            elif first:
+                record_type = FIRST_TYPE
+            elif last:
+                record_type = LAST_TYPE
+            else:
+                record_type = MIDDLE_TYPE
+            checksum = mask_crc(crc32c(fragment, crc32c(bytes([record_type]))))
+            out += struct.pack("<IHB", checksum, len(fragment), record_type) + fragment
+            first = False
+            if last:
+                break
+    return bytes(out)
+
+
+def snappy_literal(data: bytes) -> bytes:
+    """Encode data as a Snappy stream made only of literal runs."""
+    out = bytearray(encode_varint(len(data)))
+    for start in range(0, len(data), 65536):
+        chunk = data[start : start + 65536]
+        out += bytes([61 << 2]) + (len(chunk) - 1).to_bytes(2, "little") + chunk
+    return bytes(out)
+
+
+def build_block(entries: list[tuple[bytes, bytes]]) -> bytes:
+    """Build a table block without prefix sharing and a single restart point."""
+    out = bytearray()
+    for key, value in entries:
+        out += encode_varint(0) + encode_varint(len(key)) + encode_varint(len(value))
+        out += key + value
+    out += struct.pack("<II", 0, 1)
+    return bytes(out)
+
+
+def internal_key(user_key: bytes, sequence: int, value_type: int = TYPE_VALUE) -> bytes:
+    """Append the sequence/type trailer LevelDB stores after each user key."""
+    return user_key + struct.pack("<Q", (sequence << 8) | value_type)
+
+
+def build_table(
+    entries: list[tuple[bytes, int, bytes | None]],
+    block_entries: int = 2,
+    compress: bool = True,
+) -> bytes:
+    """Build a LevelDB table from (user_key, sequence, value) entries; ``None`` deletes."""
+    out = bytearray()
+
+    def write_block(block: bytes, compressed: bool) -> bytes:
+        body = snappy_literal(block) if compressed else block
+        compression = b"\x01" if compressed else b"\x00"
+        checksum = mask_crc(crc32c(body + compression))
+        handle = encode_varint(len(out)) + encode_varint(len(body))
+        out.extend(body + compression + struct.pack("<I", checksum))
+        return handle
+
+    index_entries = []
+    for start in range(0, len(entries), block_entries):
+        chunk = [
+            (
+                internal_key(key, seq, TYPE_DELETION if value is None else TYPE_VALUE),
+                value or b"",
+            )
+            for key, seq, value in entries[start : start + block_entries]
+        ]
+        handle = write_block(build_block(chunk), compress)
+        index_entries.append((chunk[-1][0], handle))
+
+    metaindex_handle = write_block(build_block([]), False)
+    index_handle = write_block(build_block(index_entries), False)
+
+    footer = metaindex_handle + index_handle
+    footer += b"\x00" * (40 - len(footer)) + struct.pack("<Q", 0xDB4775248B80FB57)
+    return bytes(out + footer)
+
+
+def build_version_edit(
+    log_number: int | None = None,
+    new_files: Sequence[tuple[int, int, bytes, bytes]] = (),
+    deleted_files: Sequence[tuple[int, int]] = (),
+) -> bytes:
+    """Build a MANIFEST version edit from (level, number, smallest, largest) tables."""
+    out = bytearray()
+    if log_number is not None:
+        out += encode_varint(2) + encode_varint(log_number)
+    for level, number in deleted_files:
+        out += encode_varint(6) + encode_varint(level) + encode_varint(number)
+    for level, number, smallest, largest in new_files:
+        smallest_key = internal_key(smallest, 1)
+        largest_key = internal_key(largest, 1)
+        out += encode_varint(7) + encode_varint(level) + encode_varint(number) + encode_varint(0)
+        out += encode_varint(len(smallest_key)) + smallest_key
+        out += encode_varint(len(largest_key)) + largest_key
+    return bytes(out)
@@ -0,0 +1,126 @@
+import lzma
+from pathlib import Path
+import subprocess
+import tarfile
+import zipfile
+
+import pytest
+
+from src import archive
+from src.archive import TarArchiveWriter, ZipArchiveWriter, open_archive
+from src.writer import NoteWriteError
+
+NOTES = {f"note-{index:03d}.txt": f"Note {index}\n".encode() * index for index in range(50)}
+
+
+def write_notes(path: Path, output_format: str) -> None:
+    with open_archive(path, output_format) as writer:
+        for filename, content in NOTES.items():
+            writer.write(filename, content)
+
+
+@pytest.mark.parametrize("output_format", ["tar", "tar.xz"])
+def test_tar_archive_round_trip(tmp_path: Path, output_format: str):
+    """Tar archives hold every note in export order and open with tarfile."""
+    path = tmp_path / f"notes.{output_format}"
+    write_notes(path, output_format)
+
+    with tarfile.open(path) as tar:
+        assert tar.getnames() == list(NOTES)
+        for member in tar.getmembers():
+            extracted = tar.extractfile(member)
+            assert extracted is not None
+            assert extracted.read() == NOTES[member.name]
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_tar_xz_archive_compresses_chunks_in_parallel(tmp_path: Path, monkeypatch):
+    """Chunks of the tar stream become separate xz streams of one valid xz file."""
+    monkeypatch.setattr(archive, "XZ_CHUNK_SIZE", 4096)
+    path = tmp_path / "notes.tar.xz"
+    write_notes(path, "tar.xz")
+
+    assert path.read_bytes().count(b"\xfd7zXZ\x00") > 2
+    with tarfile.open(fileobj=lzma.open(path)) as tar:
+        assert tar.getnames() == list(NOTES)
+
+
+def test_zip_archive_round_trip(tmp_path: Path):
+    """Zip members are deflated, verified by zipfile and kept in export order."""
+    path = tmp_path / "notes.zip"
+    write_notes(path, "zip")
+
+    with zipfile.ZipFile(path) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == list(NOTES)
+        assert all(info.compress_type == zipfile.ZIP_DEFLATED for info in zf.infolist())
+        assert zf.read("note-042.txt") == NOTES["note-042.txt"]
+
+
+def test_zip_archive_zip64_directory(tmp_path: Path, monkeypatch):
+    """Archives beyond the classic limits get a zip64 end of central directory."""
+    monkeypatch.setattr(archive, "ZIP_COUNT_LIMIT", 10)
+    path = tmp_path / "notes.zip"
+    write_notes(path, "zip")
+
+    assert b"PK\x06\x06" in path.read_bytes()
+    with zipfile.ZipFile(path) as zf:
+        assert zf.namelist() == list(NOTES)
+
+
+def test_failed_archive_leaves_no_file(tmp_path: Path):
+    """An export that fails midway removes its temporary archive."""
+    path = tmp_path / "notes.zip"
+
+    with pytest.raises(RuntimeError), ZipArchiveWriter(path) as writer:
+        writer.write("note.txt", b"text")
+        raise RuntimeError("interrupted")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unwritable_archive_reports_error(tmp_path: Path):
+    """Errors while finishing the archive are raised as NoteWriteError."""
+    path = tmp_path / "notes.tar"
+    path.mkdir()
+
+    with (
+        pytest.raises(NoteWriteError) as exc_info,
+        TarArchiveWriter(path, compress=False) as writer,
+    ):
+        writer.write("note.txt", b"text")
+
+    assert exc_info.value.filename == "notes.tar"
+    assert [entry.name for entry in tmp_path.iterdir()] == ["notes.tar"]
+
+
+def test_cli_archive_output(tmp_path: Path):
+    """--output-format writes one archive per run instead of a directory."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    out_dir = tmp_path / "output"
+    buffer_id = "a1b2c3d4e5f67890abcdef1234567890"
+    (atom_db_dir / "000005.ldb").write_bytes(f'id"  {buffer_id}"text"\x08Archived'.encode())
+
+    result = subprocess.run(
+        [
+            "python",
+            "-m",
+            "src.cli",
+            "--atom-db-dir",
+            str(atom_db_dir),
+            "--out-dir",
+            str(out_dir),
+            "--output-format",
+            "zip",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0
+    (archive_path,) = out_dir.iterdir()
+    assert archive_path.name.endswith(".zip")
+    with zipfile.ZipFile(archive_path) as zf:
+        assert zf.namelist() == ["archived__000.txt"]
+        assert zf.read("archived__000.txt") == b"Archived"
@@ -0,0 +1,144 @@
+import os
+from pathlib import Path
+import subprocess
+
+from src.cache import ExtractionCache, file_identity
+from src.leveldb import TYPE_VALUE
+from src.utils import ExtractedRecord, extract_file_records
+from tests.leveldb_helpers import build_buffer_state, build_log, build_write_batch
+
+RECORD = ExtractedRecord(
+    b"\x00state",
+    42,
+    TYPE_VALUE,
+    {"0123456789abcdef0123456789abcdef": "Grüße".encode()},
+    {"0123456789abcdef0123456789abcdef": "source.gfm"},
+    {"0123456789abcdef0123456789abcdef": 7},
+)
+
+
+def test_cache_round_trip(tmp_path: Path):
+    """Stored results are returned unchanged for an unchanged file."""
+    db_file = tmp_path / "000005.ldb"
+    db_file.write_bytes(b"table")
+    cache = ExtractionCache(tmp_path / "cache", tmp_path)
+
+    cache.put(db_file, file_identity(db_file), [RECORD])
+
+    assert cache.get(db_file) == [RECORD]
+
+
+def test_cache_misses_modified_file(tmp_path: Path):
+    """A file whose size or mtime changed is parsed again."""
+    db_file = tmp_path / "000003.log"
+    db_file.write_bytes(b"log")
+    cache = ExtractionCache(tmp_path / "cache", tmp_path)
+    cache.put(db_file, file_identity(db_file), [RECORD])
+
+    db_file.write_bytes(b"log grew")
+    os.utime(db_file, ns=(0, 0))
+
+    assert cache.get(db_file) is None
+
+
+def test_cache_prune_drops_obsolete_files(tmp_path: Path):
+    """Entries of files that left the database are removed."""
+    live, obsolete = tmp_path / "000007.ldb", tmp_path / "000004.ldb"
+    cache = ExtractionCache(tmp_path / "cache", tmp_path)
+    for path in (live, obsolete):
+        path.write_bytes(b"table")
+        cache.put(path, file_identity(path), [RECORD])
+
+    obsolete.unlink()
+    cache.prune([live])
+
+    assert cache.directory is not None
+    assert sorted(p.name for p in cache.directory.iterdir()) == ["000007.ldb.json"]
+
+
+def test_cli_reuses_cached_results(tmp_path: Path):
+    """A second run with --cache-dir does not parse unchanged files again."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    buffer_id = "a1b2c3d4e5f67890abcdef1234567890"
+    (atom_db_dir / "000005.ldb").write_bytes(f'id"  {buffer_id}"text"\x06Cached'.encode())
+
+    command = [
+        "python",
+        "-m",
+        "src.cli",
+        "--atom-db-dir",
+        str(atom_db_dir),
+        "--out-dir",
+        str(tmp_path / "output"),
+        "--cache-dir",
+        str(tmp_path / "cache"),
+    ]
+    first = subprocess.run(command, capture_output=True, text=True)
+    second = subprocess.run(command, capture_output=True, text=True)
+
+    assert first.returncode == 0
+    assert "cached results for 0 of 1" in first.stdout
+    assert second.returncode == 0
+    assert "cached results for 1 of 1" in second.stdout
+    assert "Cached" in {p.read_text() for p in (tmp_path / "output").glob("*/*")}
+
+
+def test_log_extraction_resumes_from_cursor(tmp_path: Path):
+    """Only records appended after the cursor are parsed on the next call."""
+    log_path = tmp_path / "000006.log"
+    first = build_write_batch(1, [(b"a", b"one")])
+    second = build_write_batch(2, [(b"b", b"two")])
+    log_path.write_bytes(build_log([first]))
+
+    initial = extract_file_records(log_path)
+    log_path.write_bytes(build_log([first, second]))
+    resumed = extract_file_records(log_path, initial.cursor)
+
+    assert [record.key for record in initial.records] == [b"a"]
+    assert initial.cursor is not None and initial.cursor.number == 6
+    assert resumed.resumed
+    assert [record.key for record in resumed.records] == [b"b"]
+
+
+def test_log_extraction_restarts_after_rewrite(tmp_path: Path):
+    """A log rewritten in place is read again from the start."""
+    log_path = tmp_path / "000006.log"
+    log_path.write_bytes(build_log([build_write_batch(1, [(b"a", b"one")])]))
+    initial = extract_file_records(log_path)
+
+    log_path.write_bytes(build_log([build_write_batch(5, [(b"c", b"three" * 10)])]))
+    restarted = extract_file_records(log_path, initial.cursor)
+
+    assert not restarted.resumed
+    assert [record.key for record in restarted.records] == [b"c"]
+
+
+def test_cli_resumes_growing_log(tmp_path: Path):
+    """The active log is parsed from the cached cursor once it has grown."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    log_path = atom_db_dir / "000003.log"
+
+    first = build_write_batch(1, [(b"first", build_buffer_state("1" * 32, "First note"))])
+    second = build_write_batch(2, [(b"second", build_buffer_state("2" * 32, "Second note"))])
+    log_path.write_bytes(build_log([first]))
+
+    command = [
+        "python",
+        "-m",
+        "src.cli",
+        "--atom-db-dir",
+        str(atom_db_dir),
+        "--out-dir",
+        str(tmp_path / "output"),
+        "--cache-dir",
+        str(tmp_path / "cache"),
+    ]
+    subprocess.run(command, capture_output=True, text=True, check=True)
+    log_path.write_bytes(build_log([first, second]))
+    result = subprocess.run(command, capture_output=True, text=True)
+
+    assert result.returncode == 0
+    assert "Resumed 000003.log" in result.stdout
+    assert "Exported 2 notes" in result.stdout
@@ -1,13 +1,20 @@
+import os
 from pathlib import Path
 import re
 import subprocess
+import sys
+import tracemalloc
 
-from src.cli import (
+from src import utils
+from src.utils import (
+    extract_buffer_data,
     extract_buffer_grammars,
     extract_buffers_by_id,
     is_internal_buffer,
     normalize_text,
+    remove_control_characters,
 )
+from tests.leveldb_helpers import build_buffer_state, build_log, build_table, build_write_batch
 
 
 def test_cli_requires_arguments():
@@ -258,6 +265,15 @@ def test_normalize_text():
     assert result == "HelloWorld\nNew\tLine"
 
 
+def test_remove_control_characters_matches_isprintable():
+    """Test that the table-based cleanup drops exactly the non-printable characters."""
+    every_character = "".join(map(chr, range(sys.maxunicode + 1)))
+    expected = "".join(c for c in every_character if c.isprintable() or c in "\n\t\r")
+
+    assert remove_control_characters(every_character) == expected
+    assert remove_control_characters("plain\x00 ascii\x7f\n") == "plain ascii\n"
+
+
 def test_extract_buffer_grammars():
     """Test grammar extraction from binary data."""
     buffer_id = "abcdef1234567890abcdef1234567890"
@@ -283,6 +299,45 @@ def test_extract_buffers_by_id():
     assert "Test buffer content" in decoded
 
 
+def test_extract_buffer_data_single_pass():
+    """Test that buffers and grammars are extracted together in one scan."""
+    first_id = "0123456789abcdef0123456789abcdef"
+    second_id = "fedcba9876543210fedcba9876543210"
+    sample_data = (
+        f'id"  {first_id}"text"\x05First'.encode()
+        + f'{first_id}"\x01source.gfm'.encode()
+        + f'id"  {second_id}"text"\x06Second'.encode()
+        + f'{first_id}"\x01source.python'.encode()
+    )
+
+    texts, grammars = extract_buffer_data(sample_data)
+
+    assert texts == {first_id: b"First", second_id: b"Second"}
+    assert grammars == {first_id: "source.python"}
+    assert extract_buffers_by_id(sample_data) == texts
+    assert extract_buffer_grammars(sample_data) == grammars
+
+
+def test_extract_buffer_data_reads_in_place(monkeypatch):
+    """Test that buffer records are scanned without copying their search windows."""
+    monkeypatch.setattr(utils, "SEARCH_WINDOW", 1 << 20)
+    filler = b"-" * (512 * 1024)
+    sample_data = b"".join(
+        f'id"  {index:032x}"'.encode() + filler + b'text"\x0bHello world' for index in range(8)
+    )
+    extract_buffer_data(sample_data)
+
+    tracemalloc.start()
+    try:
+        texts, _ = extract_buffer_data(sample_data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert texts == {f"{index:032x}": b"Hello world" for index in range(8)}
+    assert peak < 16 * 1024
+
+
 def test_grammar_to_extension_mapping(tmp_path: Path):
     """Test that grammar detection produces correct file extensions."""
     atom_db_dir = tmp_path / "atom_db"
@@ -326,3 +381,227 @@ def test_grammar_to_extension_mapping(tmp_path: Path):
     timestamp_dirs = list(out_dir.glob("*"))
     python_files = list(timestamp_dirs[0].glob("*.py"))
     assert len(python_files) == 1
+
+
+def test_filter_options(tmp_path: Path):
+    """Test that grammar and text filters limit which notes are exported."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+
+    notes = {
+        "aabbccdd11223344aabbccdd11223344": ("source.python", "print('keep me')"),
+        "aabbccdd11223344aabbccdd11223355": ("source.python", "print('drop me')"),
+        "aabbccdd11223344aabbccdd11223366": ("source.sql", "SELECT 'keep me';"),
+    }
+    sample_data = b""
+    for buffer_id, (grammar, text_content) in notes.items():
+        sample_data += (
+            f'{buffer_id}"\x01{grammar}\x00\x00id"  {buffer_id}"\x00\x00text"'.encode()
+            + bytes([len(text_content)])
+            + text_content.encode()
+        )
+    (atom_db_dir / "test.ldb").write_bytes(sample_data)
+
+    out_dir = tmp_path / "output"
+
+    result = subprocess.run(
+        [
+            "python",
+            "-m",
+            "src.cli",
+            "--atom-db-dir",
+            str(atom_db_dir),
+            "--out-dir",
+            str(out_dir),
+            "--include-grammar",
+            "source.python",
+            "--match",
+            "keep",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0
+    output_files = list(next(out_dir.glob("*")).glob("*"))
+    assert [path.read_text() for path in output_files] == ["print('keep me')"]
+
+
+def test_stable_names(tmp_path: Path):
+    """Test that --stable-names keeps file names stable as notes are added."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+
+    def write_note(name: str, buffer_id: str, text_content: str) -> None:
+        (atom_db_dir / name).write_bytes(
+            f'id"  {buffer_id}"text"'.encode() + bytes([len(text_content)]) + text_content.encode()
+        )
+
+    def export(out_dir: Path) -> list[str]:
+        result = subprocess.run(
+            [
+                "python",
+                "-m",
+                "src.cli",
+                "--atom-db-dir",
+                str(atom_db_dir),
+                "--out-dir",
+                str(out_dir),
+                "--stable-names",
+            ],
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0
+        return sorted(path.name for path in next(out_dir.glob("*")).glob("*"))
+
+    write_note("000002.ldb", "0123456789abcdef0123456789abcdef", "Same title")
+    assert export(tmp_path / "first") == ["same-title__01234567.txt"]
+
+    write_note("000003.ldb", "fedcba9876543210fedcba9876543210", "Another note")
+    assert export(tmp_path / "second") == [
+        "another-note__fedcba98.txt",
+        "same-title__01234567.txt",
+    ]
+
+    write_note("000004.ldb", "01234567ffffffff0123456789abcdef", "Same title")
+    assert export(tmp_path / "third") == [
+        "another-note__fedcba98.txt",
+        "same-title__01234567.txt",
+        "same-title__0123456789abcdef.txt",
+    ]
+
+
+def test_extract_buffers_by_id_multiple_records():
+    """Test that every buffer is extracted and the first record of an ID wins."""
+    first_id = "0123456789abcdef0123456789abcdef"
+    second_id = "fedcba9876543210fedcba9876543210"
+    sample_data = (
+        f'id"  {first_id}"text"\x05First'.encode()
+        + f'id"  {second_id}"text"\x06Second'.encode()
+        + f'id"  {first_id}"text"\x05Stale'.encode()
+    )
+
+    buffers = extract_buffers_by_id(sample_data)
+
+    assert buffers == {first_id: b"First", second_id: b"Second"}
+
+
+def test_newest_write_wins_across_files(tmp_path: Path):
+    """Test that the note with the highest sequence number is exported."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+
+    buffer_id = "0a1b2c3d4e5f60718293a4b5c6d7e8f9"
+
+    fresh = build_buffer_state(buffer_id, "Fresh note")
+    stale = build_buffer_state(buffer_id, "Stale note")
+
+    log_path = atom_db_dir / "000003.log"
+    log_path.write_bytes(build_log([build_write_batch(20, [(b"state", fresh)])]))
+    table_path = atom_db_dir / "000002.ldb"
+    table_path.write_bytes(build_table([(b"state", 10, stale)]))
+    os.utime(log_path, (1_000_000, 1_000_000))
+
+    out_dir = tmp_path / "output"
+
+    result = subprocess.run(
+        [
+            "python",
+            "-m",
+            "src.cli",
+            "--atom-db-dir",
+            str(atom_db_dir),
+            "--out-dir",
+            str(out_dir),
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0
+    output_files = list(next(out_dir.glob("*")).glob("*"))
+    assert len(output_files) == 1
+    assert output_files[0].read_text() == "Fresh note"
+
+
+def test_extract_large_buffer():
+    """Test that notes longer than 10,000 bytes with multi-byte lengths are extracted."""
+    buffer_id = "99887766554433221100ffeeddccbbaa"
+    text_content = "SELECT 1;\n" * 50_000
+    length = len(text_content)
+    varint = bytes([(length & 0x7F) | 0x80, ((length >> 7) & 0x7F) | 0x80, length >> 14])
+    sample_data = f'id"  {buffer_id}"text"'.encode() + varint + text_content.encode()
+
+    buffers = extract_buffers_by_id(memoryview(sample_data))
+
+    assert buffers[buffer_id] == text_content.strip().encode()
+
+
+def test_parallel_jobs_export_every_file(tmp_path: Path):
+    """Test that --jobs fans files out to workers without losing buffers."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+
+    for index in range(4):
+        buffer_id = f"{index:032x}"
+        text_content = f"Parallel note {index}"
+        (atom_db_dir / f"00000{index}.ldb").write_bytes(
+            f'id"  {buffer_id}"text"'.encode() + bytes([len(text_content)]) + text_content.encode()
+        )
+
+    out_dir = tmp_path / "output"
+
+    result = subprocess.run(
+        [
+            "python",
+            "-m",
+            "src.cli",
+            "--atom-db-dir",
+            str(atom_db_dir),
+            "--out-dir",
+            str(out_dir),
+            "--jobs",
+            "2",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0
+    output_files = list(next(out_dir.glob("*")).glob("*"))
+    assert sorted(path.read_text() for path in output_files) == [
+        f"Parallel note {index}" for index in range(4)
+    ]
+
+
+def test_parallel_jobs_do_not_fork_from_threads(tmp_path: Path):
+    """Test that worker processes are not forked from the producer thread."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    for index in range(4):
+        (atom_db_dir / f"00000{index}.ldb").write_bytes(
+            build_buffer_state(f"{index:032x}", f"Parallel note {index}")
+        )
+
+    result = subprocess.run(
+        [
+            "python",
+            "-W",
+            "default",
+            "-m",
+            "src.cli",
+            "--atom-db-dir",
+            str(atom_db_dir),
+            "--out-dir",
+            str(tmp_path / "output"),
+            "--jobs",
+            "2",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0
+    assert "DeprecationWarning" not in result.stderr
+    assert "Extracted 4 unsaved notes" in result.stdout
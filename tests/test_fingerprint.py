@@ -0,0 +1,63 @@
+import os
+from pathlib import Path
+import subprocess
+
+from src.fingerprint import database_fingerprint, load_fingerprint, store_fingerprint
+
+
+def test_fingerprint_round_trip(tmp_path: Path):
+    """A stored fingerprint matches the unchanged database."""
+    (tmp_path / "000005.ldb").write_bytes(b"table")
+    (tmp_path / "000006.log").write_bytes(b"log")
+    out_dir = tmp_path / "output"
+    out_dir.mkdir()
+
+    store_fingerprint(out_dir, database_fingerprint(tmp_path, force_ext="txt"))
+
+    assert load_fingerprint(out_dir) == database_fingerprint(tmp_path, force_ext="txt")
+    assert load_fingerprint(out_dir) != database_fingerprint(tmp_path, force_ext="md")
+
+
+def test_fingerprint_notices_log_rewrite_with_same_size_and_mtime(tmp_path: Path):
+    """A log rewritten in place changes the fingerprint through its tail checksum."""
+    log_path = tmp_path / "000006.log"
+    log_path.write_bytes(b"first")
+    stat = log_path.stat()
+    before = database_fingerprint(tmp_path)
+
+    log_path.write_bytes(b"other")
+    os.utime(log_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert database_fingerprint(tmp_path) != before
+
+
+def test_cli_skips_unchanged_database(tmp_path: Path):
+    """--skip-unchanged exports once, then exits until the database changes."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    out_dir = tmp_path / "output"
+    buffer_id = "a1b2c3d4e5f67890abcdef1234567890"
+    db_file = atom_db_dir / "000005.ldb"
+    db_file.write_bytes(f'id"  {buffer_id}"text"\x05First'.encode())
+
+    command = [
+        "python",
+        "-m",
+        "src.cli",
+        "--atom-db-dir",
+        str(atom_db_dir),
+        "--out-dir",
+        str(out_dir),
+        "--skip-unchanged",
+    ]
+    first = subprocess.run(command, capture_output=True, text=True)
+    second = subprocess.run(command, capture_output=True, text=True)
+    db_file.write_bytes(f'id"  {buffer_id}"text"\x06Second'.encode())
+    third = subprocess.run(command, capture_output=True, text=True)
+
+    assert first.returncode == 0
+    assert "Extracted 1 unsaved notes" in first.stdout
+    assert second.returncode == 0
+    assert "Database unchanged" in second.stdout
+    assert third.returncode == 0
+    assert "Extracted 1 unsaved notes" in third.stdout
@@ -0,0 +1,290 @@
+import mmap
+from pathlib import Path
+
+import pytest
+
+from src.leveldb import (
+    TYPE_DELETION,
+    TYPE_VALUE,
+    CorruptionError,
+    Record,
+    TableReader,
+    iter_log_records,
+    iter_table_records,
+    live_files,
+    resolve_records,
+    resolve_source,
+    snappy,
+)
+from src.leveldb.format import decode_varint
+from src.leveldb.log import iter_log_payloads
+from src.leveldb.manifest import LOG_LEVEL
+from src.utils import collect_files, extract_buffers_by_id, iter_file_records, locate_files
+from tests.leveldb_helpers import (
+    build_log,
+    build_table,
+    build_version_edit,
+    build_write_batch,
+    encode_varint,
+)
+
+
+def test_decode_varint_multi_byte():
+    """Varints of any width decode to the original value."""
+    for value in (0, 127, 128, 300, 2**21 + 5, 2**40):
+        encoded = encode_varint(value) + b"tail"
+        assert decode_varint(encoded, 0) == (value, len(encoded) - 4)
+
+
+def test_decode_varint_truncated():
+    """A varint cut off by the end of the data is reported as corruption."""
+    with pytest.raises(CorruptionError):
+        decode_varint(b"\x80\x80", 0)
+
+
+def test_log_reader_reassembles_fragmented_records():
+    """Records spanning several blocks come back whole and in order."""
+    large_value = bytes(range(256)) * 400
+    log = build_log(
+        [
+            build_write_batch(1, [(b"small", b"value")]),
+            build_write_batch(2, [(b"large", large_value), (b"gone", None)]),
+        ]
+    )
+
+    records = list(iter_log_records(log, verify_checksums=True))
+
+    assert records == [
+        Record(b"small", b"value", 1, TYPE_VALUE),
+        Record(b"large", large_value, 2, TYPE_VALUE),
+        Record(b"gone", b"", 3, TYPE_DELETION),
+    ]
+
+
+def test_log_reader_resumes_from_offset():
+    """The end offset of a record can be used to resume reading."""
+    log = build_log([build_write_batch(1, [(b"a", b"1")]), build_write_batch(2, [(b"b", b"2")])])
+
+    end_offset, _ = next(iter_log_payloads(log))
+    records = list(iter_log_records(log, start=end_offset))
+
+    assert records == [Record(b"b", b"2", 2, TYPE_VALUE)]
+
+
+def test_log_reader_drops_torn_tail():
+    """A record cut off by the end of the file is ignored."""
+    log = build_log([build_write_batch(1, [(b"a", b"1")]), build_write_batch(2, [(b"b", b"2")])])
+
+    records = list(iter_log_records(log[:-3]))
+
+    assert records == [Record(b"a", b"1", 1, TYPE_VALUE)]
+
+
+def test_log_reader_detects_checksum_mismatch():
+    """Damaged fragments are rejected when checksums are verified."""
+    log = bytearray(build_log([build_write_batch(1, [(b"a", b"1")])]))
+    log[-1] ^= 0xFF
+
+    with pytest.raises(CorruptionError):
+        list(iter_log_records(bytes(log), verify_checksums=True))
+
+
+def test_note_spanning_block_boundary_is_extracted(tmp_path: Path):
+    """A note split across log blocks is extracted without a spliced header."""
+    buffer_id = "00112233445566778899aabbccddeeff"
+    text = "x" * 120 + "y" * 5
+    record = f'id"  {buffer_id}"text"'.encode() + bytes([len(text)]) + text.encode()
+    value = b"\x00" * 32700 + record
+    log_path = tmp_path / "000003.log"
+    log_path.write_bytes(build_log([build_write_batch(7, [(b"state", value)])]))
+
+    records = list(iter_file_records(log_path))
+
+    assert records == [Record(b"state", value, 7, TYPE_VALUE)]
+    assert extract_buffers_by_id(records[0].value) == {buffer_id: text.encode()}
+
+
+def test_unparseable_log_falls_back_to_raw_bytes(tmp_path: Path):
+    """Files that are not LevelDB logs are scanned as raw bytes."""
+    log_path = tmp_path / "000003.log"
+    log_path.write_bytes(b"log content")
+
+    records = list(iter_file_records(log_path))
+
+    assert [record.value for record in records] == [b"log content"]
+    assert records[0].sequence == 0
+
+
+def test_snappy_decompress_literals_and_copies():
+    """Literal runs and overlapping back-references are expanded."""
+    compressed = b"\x0c" + b"\x08abc" + b"\x15\x03"
+    assert snappy.decompress(compressed) == b"abcabcabcabc"
+
+    compressed = b"\x0a" + b"\x0cwxyz" + b"\x16\x04\x00"
+    assert snappy.decompress(compressed) == b"wxyzwxyzwx"
+
+
+def test_snappy_decompress_rejects_bad_offset():
+    """Back-references before the start of the output are corruption."""
+    with pytest.raises(CorruptionError):
+        snappy.decompress(b"\x08\x00a\x11\x05")
+
+
+def test_snappy_decompress_rejects_truncated_copy():
+    """A back-reference cut off by the end of the input is corruption."""
+    with pytest.raises(CorruptionError):
+        snappy.decompress(b"\x08\x00a\x11")
+
+
+def test_table_reader_yields_records_from_compressed_blocks():
+    """Entries from every Snappy-compressed data block are returned in order."""
+    table = build_table(
+        [(b"a", 5, b"one"), (b"b", 6, None), (b"c", 7, b"three" * 100)],
+        block_entries=2,
+    )
+
+    records = list(iter_table_records(table, verify_checksums=True))
+
+    assert records == [
+        Record(b"a", b"one", 5, TYPE_VALUE),
+        Record(b"b", b"", 6, TYPE_DELETION),
+        Record(b"c", b"three" * 100, 7, TYPE_VALUE),
+    ]
+
+
+def test_table_reader_decodes_blocks_lazily():
+    """Only the blocks reached by iteration are read."""
+    table = build_table([(b"a", 1, b"x"), (b"b", 2, b"y"), (b"c", 3, b"z")], block_entries=1)
+    reader = TableReader(table)
+    handles = list(reader.iter_block_handles())
+    read_calls = []
+    original_read_block = reader.read_block
+
+    def tracking_read_block(handle):
+        read_calls.append(handle)
+        return original_read_block(handle)
+
+    reader.read_block = tracking_read_block  # type: ignore[method-assign]
+
+    first = next(iter(reader))
+
+    assert first.key == b"a"
+    assert handles[0] in read_calls
+    assert handles[2] not in read_calls
+
+
+def test_table_reader_rejects_non_table():
+    """Data without the table magic number is reported as corruption."""
+    with pytest.raises(CorruptionError):
+        TableReader(b"\x00" * 64)
+
+
+def test_compressed_table_note_is_extracted(tmp_path: Path):
+    """Notes inside Snappy-compressed tables are found by the extractors."""
+    buffer_id = "ffeeddccbbaa99887766554433221100"
+    value = f'id"  {buffer_id}"text"\x0bTable note!'.encode()
+    table_path = tmp_path / "000005.ldb"
+    table_path.write_bytes(build_table([(b"state", 9, value)]))
+
+    records = list(iter_file_records(table_path))
+
+    assert records == [Record(b"state", value, 9, TYPE_VALUE)]
+    assert extract_buffers_by_id(records[0].value) == {buffer_id: b"Table note!"}
+
+
+def test_resolve_records_newest_sequence_wins():
+    """The highest sequence number wins regardless of source order."""
+    older = [Record(b"a", b"old", 3, TYPE_VALUE), Record(b"b", b"kept", 4, TYPE_VALUE)]
+    newer = [Record(b"a", b"new", 8, TYPE_VALUE), Record(b"c", b"latest", 9, TYPE_VALUE)]
+
+    resolved = resolve_records([newer, older])
+
+    assert resolved == [
+        Record(b"c", b"latest", 9, TYPE_VALUE),
+        Record(b"a", b"new", 8, TYPE_VALUE),
+        Record(b"b", b"kept", 4, TYPE_VALUE),
+    ]
+
+
+def test_resolve_records_honours_tombstones():
+    """A newer deletion hides older values, an older one does not hide newer values."""
+    table = [Record(b"a", b"value", 2, TYPE_VALUE), Record(b"b", b"", 1, TYPE_DELETION)]
+    log = [Record(b"a", b"", 5, TYPE_DELETION), Record(b"b", b"back", 6, TYPE_VALUE)]
+
+    assert resolve_records([table, log]) == [Record(b"b", b"back", 6, TYPE_VALUE)]
+
+
+def test_resolve_source_hides_keys_of_earlier_sources():
+    """Each source is resolved on its own, and earlier sources hide later ones."""
+    log = [
+        Record(b"a", b"", 7, TYPE_DELETION),
+        Record(b"b", b"old", 5, TYPE_VALUE),
+        Record(b"b", b"new", 6, TYPE_VALUE),
+    ]
+    table = [Record(b"a", b"value", 2, TYPE_VALUE), Record(b"c", b"kept", 3, TYPE_VALUE)]
+    hidden: set[bytes] = set()
+
+    assert resolve_source(log, hidden) == [Record(b"b", b"new", 6, TYPE_VALUE)]
+    assert hidden == {b"a", b"b"}
+    assert resolve_source(table, hidden) == [Record(b"c", b"kept", 3, TYPE_VALUE)]
+
+
+def test_live_files_follow_manifest(tmp_path: Path):
+    """Only files referenced by the active MANIFEST are returned, newest data first."""
+    manifest = build_log(
+        [
+            build_version_edit(log_number=3, new_files=[(1, 4, b"a", b"m")]),
+            build_version_edit(
+                log_number=6,
+                new_files=[(0, 5, b"b", b"k"), (0, 7, b"c", b"d"), (2, 8, b"a", b"z")],
+                deleted_files=[(1, 4)],
+            ),
+        ]
+    )
+    (tmp_path / "MANIFEST-000002").write_bytes(manifest)
+    (tmp_path / "CURRENT").write_text("MANIFEST-000002\n")
+    for name in ["000003.log", "000004.ldb", "000005.ldb", "000006.log", "000007.ldb"]:
+        (tmp_path / name).write_bytes(b"")
+    (tmp_path / "000008.sst").write_bytes(b"")
+
+    files = live_files(tmp_path)
+
+    assert files is not None
+    assert [(f.path.name, f.level) for f in files] == [
+        ("000006.log", LOG_LEVEL),
+        ("000007.ldb", 0),
+        ("000005.ldb", 0),
+        ("000008.sst", 2),
+    ]
+    assert (files[2].smallest, files[2].largest) == (b"b", b"k")
+    assert collect_files(tmp_path) == [f.path for f in files]
+    assert locate_files(tmp_path) == ([f.path for f in files], True)
+
+
+def test_live_files_without_current(tmp_path: Path):
+    """Directories without CURRENT fall back to reading every file."""
+    (tmp_path / "000003.log").write_bytes(b"")
+
+    assert live_files(tmp_path) is None
+    assert collect_files(tmp_path) == [tmp_path / "000003.log"]
+    assert locate_files(tmp_path) == ([tmp_path / "000003.log"], False)
+
+
+def test_file_records_are_read_from_memory_map(tmp_path: Path):
+    """Log values are slices of the mapped file rather than heap copies."""
+    log_path = tmp_path / "000003.log"
+    log_path.write_bytes(build_log([build_write_batch(1, [(b"state", b"value")])]))
+
+    (record,) = iter_file_records(log_path)
+
+    assert isinstance(record.value, memoryview)
+    assert isinstance(record.value.obj, mmap.mmap)
+    assert record.value == b"value"
+
+
+def test_empty_file_is_not_mapped(tmp_path: Path):
+    """Empty files yield a single empty raw record."""
+    log_path = tmp_path / "000003.log"
+    log_path.write_bytes(b"")
+
+    assert [bytes(record.value) for record in iter_file_records(log_path)] == [b""]
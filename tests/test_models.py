@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 import tempfile
 
@@ -162,3 +163,71 @@ def test_cliconfig_path_objects():
 
         assert isinstance(config.atom_db_dir, Path)
         assert isinstance(config.out_dir, Path)
+
+
+def test_cliconfig_jobs_defaults_to_cpu_count(tmp_path: Path):
+    """CliConfig uses one job per CPU unless told otherwise."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    (atom_db_dir / "test.ldb").write_bytes(b"dummy")
+
+    assert CliConfig(atom_db_dir=atom_db_dir, out_dir=tmp_path).jobs == (os.cpu_count() or 1)
+    assert CliConfig(atom_db_dir=atom_db_dir, out_dir=tmp_path, jobs=None).jobs >= 1
+    assert CliConfig(atom_db_dir=atom_db_dir, out_dir=tmp_path, jobs=3).jobs == 3
+
+
+def test_cliconfig_rejects_zero_jobs(tmp_path: Path):
+    """CliConfig rejects job counts below 1."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    (atom_db_dir / "test.ldb").write_bytes(b"dummy")
+
+    with pytest.raises(ValidationError) as exc_info:
+        CliConfig(atom_db_dir=atom_db_dir, out_dir=tmp_path, jobs=0)
+
+    assert "at least 1" in str(exc_info.value)
+
+
+def test_cliconfig_rejects_negative_debounce(tmp_path: Path):
+    """CliConfig rejects a negative watch-mode debounce interval."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    (atom_db_dir / "test.ldb").write_bytes(b"dummy")
+
+    with pytest.raises(ValidationError) as exc_info:
+        CliConfig(atom_db_dir=atom_db_dir, out_dir=tmp_path, watch=True, debounce=-1)
+
+    assert "cannot be negative" in str(exc_info.value)
+
+
+def test_cliconfig_validates_filters(tmp_path: Path):
+    """CliConfig rejects negative or inverted size bounds and invalid patterns."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    (atom_db_dir / "test.ldb").write_bytes(b"dummy")
+
+    with pytest.raises(ValidationError) as exc_info:
+        CliConfig(atom_db_dir=atom_db_dir, out_dir=tmp_path, min_size=-1)
+    assert "cannot be negative" in str(exc_info.value)
+
+    with pytest.raises(ValidationError) as exc_info:
+        CliConfig(atom_db_dir=atom_db_dir, out_dir=tmp_path, min_size=10, max_size=5)
+    assert "smaller than minimum size" in str(exc_info.value)
+
+    with pytest.raises(ValidationError) as exc_info:
+        CliConfig(atom_db_dir=atom_db_dir, out_dir=tmp_path, match="(unclosed")
+    assert "Invalid regular expression" in str(exc_info.value)
+
+
+def test_cliconfig_rejects_snapshot_store_archives(tmp_path: Path):
+    """CliConfig rejects archive output for snapshot-store exports."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    (atom_db_dir / "test.ldb").write_bytes(b"dummy")
+
+    with pytest.raises(ValidationError) as exc_info:
+        CliConfig(
+            atom_db_dir=atom_db_dir, out_dir=tmp_path, snapshot_store=True, output_format="zip"
+        )
+
+    assert "cannot be written as zip archives" in str(exc_info.value)
@@ -0,0 +1,276 @@
+from concurrent.futures.process import BrokenProcessPool
+import logging
+import os
+from pathlib import Path
+import re
+
+import pytest
+
+from src import notes, utils
+from src.notes import Note, NoteFilter, iter_notes
+from tests.leveldb_helpers import (
+    build_buffer_state,
+    build_log,
+    build_table,
+    build_version_edit,
+    build_write_batch,
+)
+
+FIRST_ID = "0a1b2c3d4e5f60718293a4b5c6d7e8f9"
+SECOND_ID = "99887766554433221100ffeeddccbbaa"
+
+
+def build_database(atom_db_dir: Path) -> None:
+    atom_db_dir.mkdir()
+    (atom_db_dir / "000003.log").write_bytes(
+        build_log([build_write_batch(20, [(b"first", build_buffer_state(FIRST_ID, "Fresh note"))])])
+    )
+    (atom_db_dir / "000002.ldb").write_bytes(
+        build_table(
+            [
+                (b"first", 10, build_buffer_state(FIRST_ID, "Stale note")),
+                (b"second", 11, build_buffer_state(SECOND_ID, "Other note")),
+            ]
+        )
+    )
+
+
+def test_iter_notes_yields_current_notes_with_provenance(tmp_path: Path):
+    """Every buffer is yielded once, from the newest write, with where it was read from."""
+    atom_db_dir = tmp_path / "atom_db"
+    build_database(atom_db_dir)
+
+    notes = list(iter_notes(atom_db_dir, jobs=1))
+
+    assert notes == [
+        Note(bytes.fromhex(FIRST_ID), b"Fresh note", None, "txt", atom_db_dir / "000003.log", 20),
+        Note(bytes.fromhex(SECOND_ID), b"Other note", None, "txt", atom_db_dir / "000002.ldb", 11),
+    ]
+    assert notes[0].text == "Fresh note"
+    assert [note.buffer_id for note in notes] == [FIRST_ID, SECOND_ID]
+
+
+def test_iter_notes_newest_write_wins_without_manifest(tmp_path: Path):
+    """Without a MANIFEST, file numbers do not decide which write is the newest."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    (atom_db_dir / "000009.ldb").write_bytes(
+        build_table([(b"state", 20, build_buffer_state(FIRST_ID, "Fresh note"))])
+    )
+    (atom_db_dir / "000012.ldb").write_bytes(
+        build_table([(b"state", 5, build_buffer_state(FIRST_ID, "Stale note"))])
+    )
+
+    notes = list(iter_notes(atom_db_dir, jobs=1))
+
+    assert [(note.text, note.source.name) for note in notes] == [("Fresh note", "000009.ldb")]
+
+
+def test_iter_notes_streams_notes_file_by_file(tmp_path: Path, monkeypatch):
+    """The first note is yielded before the texts of the last file are read."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    (atom_db_dir / "000005.ldb").write_bytes(
+        build_table([(b"first", 20, build_buffer_state(FIRST_ID, "Fresh note"))])
+    )
+    (atom_db_dir / "000004.ldb").write_bytes(
+        build_table([(b"second", 11, build_buffer_state(SECOND_ID, "Other note"))])
+    )
+    (atom_db_dir / "MANIFEST-000002").write_bytes(
+        build_log(
+            [
+                build_version_edit(
+                    log_number=3,
+                    new_files=[(0, 5, b"first", b"first"), (1, 4, b"second", b"second")],
+                )
+            ]
+        )
+    )
+    (atom_db_dir / "CURRENT").write_text("MANIFEST-000002\n")
+    read: list[str] = []
+    read_file_texts = notes.read_file_texts
+
+    def record_read(
+        path: Path, wanted: dict[tuple[bytes, int], list[str]]
+    ) -> dict[str, bytes | None]:
+        read.append(path.name)
+        return read_file_texts(path, wanted)
+
+    monkeypatch.setattr(notes, "read_file_texts", record_read)
+
+    stream = iter_notes(atom_db_dir, jobs=1)
+    first = next(stream)
+
+    assert (first.text, read) == ("Fresh note", ["000005.ldb"])
+    assert [note.text for note in stream] == ["Other note"]
+    assert read == ["000005.ldb", "000004.ldb"]
+
+
+def test_iter_notes_since_sequence(tmp_path: Path):
+    """Only notes written after the given sequence number are yielded."""
+    atom_db_dir = tmp_path / "atom_db"
+    build_database(atom_db_dir)
+
+    notes = list(iter_notes(atom_db_dir, jobs=1, since=11, default_extension="md"))
+
+    assert [(note.buffer_id, note.extension) for note in notes] == [(FIRST_ID, "md")]
+
+
+def test_iter_notes_shares_grammar_strings(tmp_path: Path):
+    """Notes carry binary IDs and share one grammar and extension string per value."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    grammar_map = "".join(f'{index:032x}"\x01source.python"' for index in range(3))
+    buffers = "".join(
+        build_buffer_state(f"{index:032x}", f"note {index}").decode() for index in range(3)
+    )
+    (atom_db_dir / "000002.ldb").write_bytes(f"{grammar_map}{buffers}".encode())
+
+    notes = list(iter_notes(atom_db_dir, jobs=1))
+
+    assert len(notes) == 3
+    assert all(len(note.buffer_key) == 16 and not hasattr(note, "__dict__") for note in notes)
+    assert len({id(note.grammar) for note in notes}) == 1
+    assert len({id(note.extension) for note in notes}) == 1
+    assert notes[0].grammar == "source.python"
+    assert notes[0].extension == "py"
+
+
+def test_iter_notes_applies_grammar_written_before_the_text(tmp_path: Path):
+    """A grammar set in an older record applies to the buffer's newer text."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    grammar_map = f'{FIRST_ID}"\x01source.python"'.encode()
+    (atom_db_dir / "000003.log").write_bytes(
+        build_log(
+            [
+                build_write_batch(5, [(b"grammars", grammar_map)]),
+                build_write_batch(10, [(b"state", build_buffer_state(FIRST_ID, "hello world"))]),
+            ]
+        )
+    )
+    (atom_db_dir / "000002.ldb").write_bytes(
+        build_table([(b"old-grammars", 3, f'{SECOND_ID}"\x0bsource.json"'.encode())])
+    )
+    (atom_db_dir / "000004.ldb").write_bytes(
+        build_table([(b"other", 8, build_buffer_state(SECOND_ID, "other note"))])
+    )
+
+    notes = list(iter_notes(atom_db_dir, jobs=1))
+
+    assert {(note.buffer_id, note.grammar, note.extension) for note in notes} == {
+        (FIRST_ID, "source.python", "py"),
+        (SECOND_ID, "source.json", "json"),
+    }
+
+
+def test_iter_notes_filters(tmp_path: Path):
+    """Filtered notes are skipped, and a filtered newer version still hides the older one."""
+    atom_db_dir = tmp_path / "atom_db"
+    build_database(atom_db_dir)
+
+    def buffer_ids(note_filter: NoteFilter) -> list[str]:
+        return [note.buffer_id for note in iter_notes(atom_db_dir, jobs=1, note_filter=note_filter)]
+
+    assert buffer_ids(NoteFilter(pattern=re.compile("Stale|Other"))) == [SECOND_ID]
+    assert buffer_ids(NoteFilter(min_size=len("Fresh note") + 1)) == []
+    assert buffer_ids(NoteFilter(max_size=len("Fresh note"))) == [FIRST_ID, SECOND_ID]
+    assert buffer_ids(NoteFilter(include_grammars=frozenset({"source.python"}))) == []
+    assert buffer_ids(NoteFilter(exclude_grammars=frozenset({"source.python"}))) == [
+        FIRST_ID,
+        SECOND_ID,
+    ]
+
+
+def test_iter_notes_never_decodes_rejected_buffers(tmp_path: Path, monkeypatch):
+    """Buffers rejected by grammar or stored size are dropped before their text is decoded."""
+    atom_db_dir = tmp_path / "atom_db"
+    build_database(atom_db_dir)
+    decoded: list[str] = []
+    clean_buffer_text = utils.clean_buffer_text
+
+    def record_clean(text: str) -> bytes:
+        decoded.append(text)
+        return clean_buffer_text(text)
+
+    monkeypatch.setattr(utils, "clean_buffer_text", record_clean)
+
+    assert list(iter_notes(atom_db_dir, jobs=1, note_filter=NoteFilter(max_size=9))) == []
+    assert (
+        list(
+            iter_notes(
+                atom_db_dir,
+                jobs=1,
+                note_filter=NoteFilter(include_grammars=frozenset({"source.python"})),
+            )
+        )
+        == []
+    )
+    assert decoded == []
+
+    assert len(list(iter_notes(atom_db_dir, jobs=1, note_filter=NoteFilter(max_size=10)))) == 2
+    assert decoded == ["Fresh note", "Other note"]
+
+
+def test_note_filter_checks_grammar_and_size_before_text():
+    """Raw checks see only grammar and byte size; the pattern sees the text."""
+    note_filter = NoteFilter(
+        include_grammars=frozenset({"source.python", "source.sql"}),
+        exclude_grammars=frozenset({"source.sql"}),
+        min_size=2,
+        max_size=4,
+        pattern=re.compile(r"^\d+$"),
+    )
+
+    assert note_filter.accepts_raw("source.python", 3)
+    assert not note_filter.accepts_raw(None, 3)
+    assert not note_filter.accepts_raw("source.sql", 3)
+    assert not note_filter.accepts_raw("source.python", 1)
+    assert not note_filter.accepts_raw("source.python", 5)
+    assert note_filter.accepts_text("123")
+    assert not note_filter.accepts_text("12a")
+
+
+def test_iter_notes_without_files(tmp_path: Path):
+    """A directory without LevelDB files is reported before iteration starts."""
+    with pytest.raises(FileNotFoundError):
+        iter_notes(tmp_path)
+
+
+def test_iter_notes_parses_in_process_by_default(tmp_path: Path, monkeypatch):
+    """Without ``jobs``, no worker processes are started for the caller."""
+    atom_db_dir = tmp_path / "atom_db"
+    build_database(atom_db_dir)
+    monkeypatch.setattr(notes, "ProcessPoolExecutor", None)
+
+    assert len(list(iter_notes(atom_db_dir))) == 2
+
+
+def _exit_worker(*_: object) -> None:
+    os._exit(1)
+
+
+def test_iter_notes_raises_broken_worker_pool(tmp_path: Path, monkeypatch):
+    """A dead worker process fails the read instead of skipping every file."""
+    atom_db_dir = tmp_path / "atom_db"
+    build_database(atom_db_dir)
+    monkeypatch.setattr(notes, "index_file_records", _exit_worker)
+
+    with pytest.raises(BrokenProcessPool):
+        list(iter_notes(atom_db_dir, jobs=2))
+
+
+def test_iter_notes_logs_instead_of_printing(tmp_path: Path, capsys, caplog):
+    """Progress goes to the logging module; nothing is written to stdout."""
+    atom_db_dir = tmp_path / "atom_db"
+    build_database(atom_db_dir)
+    (atom_db_dir / "000004.ldb").write_bytes(
+        build_buffer_state(f"{4:032x}", "Workspace deserializer")
+    )
+
+    with caplog.at_level(logging.INFO, logger="src"):
+        notes = list(iter_notes(atom_db_dir, jobs=1))
+
+    assert len(notes) == 2
+    assert capsys.readouterr().out == ""
+    assert "Skipping internal buffer" in caplog.text
@@ -0,0 +1,42 @@
+import pytest
+
+from src.pipeline import bounded
+
+
+def test_bounded_preserves_order():
+    """Items arrive in the order they were produced."""
+    assert list(bounded(range(200), maxsize=4)) == list(range(200))
+
+
+def test_bounded_limits_read_ahead():
+    """The producer never runs more than the queue size ahead of the consumer."""
+    produced = []
+
+    def items():
+        for index in range(100):
+            produced.append(index)
+            yield index
+
+    stream = bounded(items(), maxsize=3)
+    for consumed, item in enumerate(stream, start=1):
+        assert item == consumed - 1
+        assert len(produced) <= consumed + 3 + 1
+        if consumed == 10:
+            break
+    stream.close()
+
+    assert len(produced) < 100
+
+
+def test_bounded_reraises_producer_errors():
+    """An exception raised while producing reaches the consumer after earlier items."""
+
+    def items():
+        yield 1
+        raise ValueError("corrupt block")
+
+    stream = bounded(items())
+
+    assert next(stream) == 1
+    with pytest.raises(ValueError, match="corrupt block"):
+        next(stream)
@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+import subprocess
+
+from src import snapshot
+from src.snapshot import SnapshotStore
+
+
+def test_snapshot_store_keeps_one_blob_per_content(tmp_path: Path):
+    """Identical notes in different snapshots share a single blob."""
+    store = SnapshotStore(tmp_path)
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+
+    for snapshot_dir in (first, second):
+        digest = store.add(b"Same note")
+        store.link(digest, snapshot_dir / "same-note__000.txt")
+
+    assert store.blobs_written == 1
+    assert (first / "same-note__000.txt").read_bytes() == b"Same note"
+    assert (first / "same-note__000.txt").stat().st_ino == (
+        second / "same-note__000.txt"
+    ).stat().st_ino
+    assert store.blob_path(digest).stat().st_nlink == 3
+
+
+def test_durable_snapshot_store_syncs_blob_directories(tmp_path: Path, monkeypatch):
+    """A durable store fsyncs each touched blob directory once per sync."""
+    synced: list[Path] = []
+    monkeypatch.setattr(snapshot, "fsync_directory", synced.append)
+    store = SnapshotStore(tmp_path, durable=True)
+
+    digests = [store.add(content) for content in (b"First", b"Second", b"First")]
+    store.sync()
+    store.sync()
+
+    blob_dirs = sorted({store.blob_path(digest).parent for digest in digests})
+    assert synced == [*blob_dirs, store.blob_dir]
+
+
+def test_durable_manifest_is_written_atomically(tmp_path: Path, monkeypatch):
+    """A durable store writes the manifest through an fsynced temporary file."""
+    written: list[tuple[Path, bool]] = []
+    monkeypatch.setattr(
+        snapshot, "write_file_atomic", lambda path, _, durable: written.append((path, durable))
+    )
+    store = SnapshotStore(tmp_path, durable=True)
+
+    manifest_path = store.write_manifest(tmp_path, {"note__000.txt": "digest"})
+
+    assert written == [(manifest_path, True)]
+
+
+def test_cli_snapshot_store(tmp_path: Path):
+    """--snapshot-store hardlinks notes to blobs and writes a manifest."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    out_dir = tmp_path / "output"
+    buffer_id = "a1b2c3d4e5f67890abcdef1234567890"
+    (atom_db_dir / "000005.ldb").write_bytes(f'id"  {buffer_id}"text"\x06Stored'.encode())
+
+    result = subprocess.run(
+        [
+            "python",
+            "-m",
+            "src.cli",
+            "--atom-db-dir",
+            str(atom_db_dir),
+            "--out-dir",
+            str(out_dir),
+            "--snapshot-store",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0
+    (snapshot_dir,) = [path for path in out_dir.iterdir() if path.name != ".blobs"]
+    manifest = json.loads((snapshot_dir / "manifest.json").read_text())
+    assert list(manifest) == ["stored__000.txt"]
+
+    blob = SnapshotStore(out_dir).blob_path(manifest["stored__000.txt"])
+    assert blob.read_bytes() == b"Stored"
+    assert blob.stat().st_ino == (snapshot_dir / "stored__000.txt").stat().st_ino
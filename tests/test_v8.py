@@ -0,0 +1,115 @@
+import pytest
+
+from src.utils import extract_buffer_grammars, extract_buffers_by_id
+from src.v8 import V8DecodeError, V8String, decode_indexeddb_value, iter_indexeddb_objects
+from tests.v8_helpers import indexeddb_value, serialize_v8
+
+ATOM_STATE = {
+    "version": 1,
+    "project": {
+        "deserializer": "Project",
+        "buffers": [
+            {"id": "0123456789abcdef0123456789abcdef", "text": "Grüße aus Köln", "version": 5},
+            {"id": "fedcba9876543210fedcba9876543210", "text": "日本語のメモ\nline two"},
+            {"id": "00000000000000000000000000000000", "digestWhenLastPersisted": False},
+        ],
+    },
+    "grammars": {
+        "grammarOverridesByPath": {},
+        "languageOverridesByBufferId": {"fedcba9876543210fedcba9876543210": "source.python"},
+    },
+    "scale": 1.5,
+    "nothing": None,
+}
+
+
+def test_decode_full_value():
+    """Every value type used by Atom's state round-trips."""
+    assert decode_indexeddb_value(indexeddb_value(ATOM_STATE)) == ATOM_STATE
+
+
+def test_iter_objects_yields_only_wanted_fields():
+    """Only the requested properties are decoded, per object."""
+    objects = list(iter_indexeddb_objects(indexeddb_value(ATOM_STATE), {"id", "text"}.__contains__))
+
+    assert objects == [
+        {"id": "0123456789abcdef0123456789abcdef", "text": "Grüße aus Köln"},
+        {"id": "fedcba9876543210fedcba9876543210", "text": "日本語のメモ\nline two"},
+        {"id": "00000000000000000000000000000000"},
+    ]
+
+
+def test_iter_objects_leaves_raw_fields_undecoded():
+    """Strings under raw keys come back as their stored payload and codec."""
+    objects = list(
+        iter_indexeddb_objects(
+            indexeddb_value(ATOM_STATE), {"id", "text"}.__contains__, "text".__eq__
+        )
+    )
+
+    text = objects[1]["text"]
+    assert isinstance(text, V8String)
+    assert text.encoding == "utf-16-le"
+    assert len(text.payload) == 2 * len("日本語のメモ\nline two")
+    assert text.decode() == "日本語のメモ\nline two"
+
+
+def test_large_varint_lengths():
+    """String lengths that need more than two varint bytes are decoded."""
+    text = "x" * 3_000_000
+    assert decode_indexeddb_value(indexeddb_value({"text": text})) == {"text": text}
+
+
+def test_rejects_non_v8_data():
+    """Data without a version header is not mistaken for a V8 value."""
+    with pytest.raises(V8DecodeError):
+        decode_indexeddb_value(b'id"  0123"text"\x05Hello')
+
+
+def test_rejects_truncated_value():
+    """A value cut short raises a decode error instead of an IndexError."""
+    data = indexeddb_value(ATOM_STATE)
+    with pytest.raises(V8DecodeError):
+        decode_indexeddb_value(data[:-10])
+
+
+def test_extractors_use_v8_decoder():
+    """Buffers and grammars are read from V8 values without pattern matching."""
+    data = indexeddb_value(ATOM_STATE)
+
+    assert extract_buffers_by_id(data) == {
+        "0123456789abcdef0123456789abcdef": "Grüße aus Köln".encode(),
+        "fedcba9876543210fedcba9876543210": "日本語のメモ\nline two".encode(),
+    }
+    assert extract_buffer_grammars(data) == {"fedcba9876543210fedcba9876543210": "source.python"}
+
+
+def test_serialized_key_order_is_irrelevant():
+    """Text may precede the ID inside a buffer object."""
+    value = serialize_v8({"text": "first", "id": "0123456789abcdef0123456789abcdef"})
+    data = b"\x01\xff\x14\xff\x0f" + value
+
+    assert extract_buffers_by_id(data) == {"0123456789abcdef0123456789abcdef": b"first"}
+
+
+def test_scanner_decodes_one_and_two_byte_strings():
+    """Without a usable header, the byte scanner still decodes Latin-1 and UTF-16 text."""
+    data = serialize_v8(ATOM_STATE["project"])
+
+    with pytest.raises(V8DecodeError):
+        decode_indexeddb_value(data)
+    assert extract_buffers_by_id(data) == {
+        "0123456789abcdef0123456789abcdef": "Grüße aus Köln".encode(),
+        "fedcba9876543210fedcba9876543210": "日本語のメモ\nline two".encode(),
+        "00000000000000000000000000000000": b"",
+    }
+
+
+def test_scanner_skips_two_byte_alignment_padding():
+    """A padding byte between the text key and a two-byte string is skipped."""
+    payload = "Привет".encode("utf-16-le")
+    data = (
+        b'"\x02id" 0123456789abcdef0123456789abcdef"\x04text\x00c' + bytes([len(payload)]) + payload
+    )
+
+    assert extract_buffers_by_id(data) == {"0123456789abcdef0123456789abcdef": "Привет".encode()}
@@ -0,0 +1,109 @@
+from pathlib import Path
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from src.watch import InotifyWatcher, PollingWatcher, open_watcher, wait_for_change
+
+
+def test_polling_watcher_reports_changes(tmp_path: Path):
+    """The polling watcher notices new and modified files, and stays quiet otherwise."""
+    watcher = PollingWatcher(tmp_path, interval=0.01)
+
+    assert watcher.wait(0.05) is False
+
+    (tmp_path / "000003.log").write_bytes(b"record")
+    assert watcher.wait(1.0) is True
+    assert watcher.wait(0.05) is False
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_watcher_reports_changes(tmp_path: Path):
+    """The inotify watcher drains a burst of events into a single change."""
+    watcher = InotifyWatcher(tmp_path)
+    try:
+        assert watcher.wait(0.05) is False
+
+        for number in range(3):
+            (tmp_path / f"00000{number}.ldb").write_bytes(b"table")
+        assert watcher.wait(1.0) is True
+        assert watcher.wait(0.05) is False
+    finally:
+        watcher.close()
+
+
+def test_open_watcher_falls_back_to_polling(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Platforms without inotify are watched by polling."""
+    monkeypatch.setattr(sys, "platform", "darwin")
+
+    assert open_watcher(tmp_path).name == "polling"
+
+
+def test_wait_for_change_waits_for_quiet_period(tmp_path: Path):
+    """A burst of writes is only reported once the directory has been quiet."""
+    watcher = PollingWatcher(tmp_path, interval=0.01)
+    log_file = tmp_path / "000003.log"
+
+    def write_burst():
+        for index in range(5):
+            log_file.write_bytes(b"x" * (index + 1))
+            time.sleep(0.03)
+
+    writer = threading.Thread(target=write_burst)
+    writer.start()
+    wait_for_change(watcher, debounce=0.1)
+    writer.join()
+
+    assert log_file.stat().st_size == 5
+
+
+def _wait_for_notes(out_dir: Path, count: int, timeout: float = 10.0) -> list[Path]:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        notes = sorted(out_dir.glob("*/*"))
+        if len(notes) >= count:
+            return notes
+        time.sleep(0.05)
+    return sorted(out_dir.glob("*/*"))
+
+
+def test_cli_watch_exports_only_changed_buffers(tmp_path: Path):
+    """Watch mode exports everything once, then only buffers that changed."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    out_dir = tmp_path / "output"
+    (atom_db_dir / "000005.ldb").write_bytes(f'id"  {"1" * 32}"text"\x0aFirst note'.encode())
+
+    process = subprocess.Popen(
+        [
+            "python",
+            "-m",
+            "src.cli",
+            "--atom-db-dir",
+            str(atom_db_dir),
+            "--out-dir",
+            str(out_dir),
+            "--watch",
+            "--debounce",
+            "0.2",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    try:
+        assert len(_wait_for_notes(out_dir, 1)) == 1
+
+        (atom_db_dir / "000006.ldb").write_bytes(f'id"  {"2" * 32}"text"\x0bSecond note'.encode())
+        notes = _wait_for_notes(out_dir, 2)
+    finally:
+        process.send_signal(signal.SIGINT)
+        output, _ = process.communicate(timeout=10)
+
+    assert process.returncode == 0
+    assert "Stopped watching" in output
+    assert sorted(note.read_text() for note in notes) == ["First note", "Second note"]
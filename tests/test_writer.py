@@ -0,0 +1,83 @@
+from pathlib import Path
+import subprocess
+
+import pytest
+
+from src import writer
+from src.writer import NoteWriteError, NoteWriter, write_file_atomic
+
+
+def test_note_writer_writes_every_file(tmp_path: Path):
+    """All queued notes end up in place, without temporary files left behind."""
+    with NoteWriter(tmp_path, threads=4) as note_writer:
+        for index in range(100):
+            note_writer.write(f"note-{index}.txt", f"Note {index}".encode())
+
+    assert note_writer.files_written == 100
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        f"note-{index}.txt" for index in range(100)
+    )
+    assert (tmp_path / "note-42.txt").read_text() == "Note 42"
+
+
+def test_note_writer_syncs_directory_once_per_batch(tmp_path: Path, monkeypatch):
+    """Durable mode fsyncs the directory per batch of files, plus its parent on close."""
+    synced: list[Path] = []
+    monkeypatch.setattr(writer, "fsync_directory", synced.append)
+
+    with NoteWriter(tmp_path, durable=True, threads=2, batch_size=10) as note_writer:
+        for index in range(25):
+            note_writer.write(f"note-{index}.txt", b"text")
+
+    assert synced == [tmp_path, tmp_path, tmp_path, tmp_path.parent]
+
+
+def test_note_writer_reports_failed_file(tmp_path: Path):
+    """A failed write names the file and leaves no partial file behind."""
+    (tmp_path / "taken.txt").mkdir()
+
+    with pytest.raises(NoteWriteError) as exc_info, NoteWriter(tmp_path) as note_writer:
+        note_writer.write("taken.txt", b"text")
+
+    assert exc_info.value.filename == "taken.txt"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["taken.txt"]
+
+
+def test_write_file_atomic_replaces_existing_file(tmp_path: Path):
+    """An existing file is replaced as a whole."""
+    path = tmp_path / "note.txt"
+    path.write_text("old contents that are longer")
+
+    write_file_atomic(path, b"new", durable=True)
+
+    assert path.read_bytes() == b"new"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_cli_durable_export(tmp_path: Path):
+    """--durable exports notes through the writer like a regular run."""
+    atom_db_dir = tmp_path / "atom_db"
+    atom_db_dir.mkdir()
+    out_dir = tmp_path / "output"
+    buffer_id = "a1b2c3d4e5f67890abcdef1234567890"
+    (atom_db_dir / "000005.ldb").write_bytes(f'id"  {buffer_id}"text"\x07Durable'.encode())
+
+    result = subprocess.run(
+        [
+            "python",
+            "-m",
+            "src.cli",
+            "--atom-db-dir",
+            str(atom_db_dir),
+            "--out-dir",
+            str(out_dir),
+            "--durable",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0
+    (snapshot_dir,) = out_dir.iterdir()
+    assert [path.name for path in snapshot_dir.iterdir()] == ["durable__000.txt"]
+    assert (snapshot_dir / "durable__000.txt").read_text() == "Durable"
@@ -0,0 +1,40 @@
+"""Serializer producing V8 structured-clone values for test fixtures."""
+
+import struct
+from typing import Any
+
+from tests.leveldb_helpers import encode_varint
+
+INDEXEDDB_PREFIX = b"\x01\xff\x14\xff\x0f"
+
+
+def serialize_v8(value: Any) -> bytes:
+    """Serialize plain Python data the way V8 writes the equivalent JS value."""
+    if value is None:
+        return b"0"
+    if value is True:
+        return b"T"
+    if value is False:
+        return b"F"
+    if isinstance(value, int):
+        return b"I" + encode_varint((value << 1) ^ (value >> 63))
+    if isinstance(value, float):
+        return b"N" + struct.pack("<d", value)
+    if isinstance(value, str):
+        if all(ord(c) < 256 for c in value):
+            payload = value.encode("latin-1")
+            return b'"' + encode_varint(len(payload)) + payload
+        payload = value.encode("utf-16-le")
+        return b"c" + encode_varint(len(payload)) + payload
+    if isinstance(value, dict):
+        body = b"".join(serialize_v8(k) + serialize_v8(v) for k, v in value.items())
+        return b"o" + body + b"{" + encode_varint(len(value))
+    if isinstance(value, list):
+        body = b"".join(serialize_v8(item) for item in value)
+        return b"A" + encode_varint(len(value)) + body + b"$\x00" + encode_varint(len(value))
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def indexeddb_value(value: Any) -> bytes:
+    """Serialize a value as Chromium stores it in an IndexedDB object store record."""
+    return INDEXEDDB_PREFIX + serialize_v8(value)